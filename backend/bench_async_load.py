@@ -0,0 +1,260 @@
+"""Load test: slow downloaders against the WSGI and the ASGI deployment.
+
+Starts the backend twice on local ports:
+
+- WSGI: ``gunicorn -c gunicorn.conf.py config.wsgi`` (sync workers, the
+  current setup) serving ``/api/...``
+- ASGI: ``uvicorn config.asgi:application`` (one process) serving the async
+  views under ``/api/async/...``
+
+and drives each with a stand-in client built on raw asyncio sockets. For every
+concurrency level it opens N "slow" connections that download an export with
+a tiny receive buffer and read it at a trickle, and meanwhile probes the
+history endpoint. It reports how many slow downloads got their first byte
+(concurrent-connection capacity) and the probe latency while they are held.
+
+The script uploads a synthetic CSV through /api/upload/ first. Both servers
+run with ``config.bench_settings`` against a throwaway database and media
+folder, which is migrated up front and deleted at the end, so the project
+database and its uploads are left alone.
+
+Usage (from the backend folder):
+
+    python bench_async_load.py [--rows 200000] [--levels 8 32 128] [--hold 10]
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parent
+HOST = "127.0.0.1"
+
+TYPES = ["Pump", "Compressor", "Valve", "HeatExchanger", "Reactor", "Condenser"]
+
+
+def synthetic_csv(rows):
+    buffer = io.StringIO()
+    buffer.write("Equipment Name,Type,Flowrate,Pressure,Temperature\n")
+    rng = random.Random(42)
+    for i in range(rows):
+        buffer.write(
+            f"Unit-{i},{rng.choice(TYPES)},{rng.uniform(50, 300):.2f},"
+            f"{rng.uniform(1, 15):.2f},{rng.uniform(20, 250):.2f}\n"
+        )
+    return buffer.getvalue().encode()
+
+
+# ----------------------------------------------------------------------
+# Servers
+# ----------------------------------------------------------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((HOST, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def bench_env(bench_dir):
+    return dict(os.environ, DJANGO_SETTINGS_MODULE="config.bench_settings",
+                EQUIPMENT_BENCH_DIR=str(bench_dir))
+
+
+def migrate(bench_dir):
+    subprocess.run([sys.executable, "manage.py", "migrate", "--verbosity", "0"],
+                   cwd=BACKEND_DIR, env=bench_env(bench_dir), check=True)
+
+
+def start_server(kind, port, bench_dir):
+    env = bench_env(bench_dir)
+    if kind == "wsgi":
+        env["GUNICORN_BIND"] = f"{HOST}:{port}"
+        cmd = ["gunicorn", "-c", "gunicorn.conf.py", "config.wsgi"]
+    else:
+        cmd = ["uvicorn", "config.asgi:application", "--host", HOST, "--port", str(port),
+               "--log-level", "warning"]
+    if shutil.which(cmd[0]) is None:
+        return None
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_for_port(port):
+        proc.terminate()
+        return None
+    return proc
+
+
+# ----------------------------------------------------------------------
+# Stand-in client
+# ----------------------------------------------------------------------
+async def open_connection(port, rcvbuf=None):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, (HOST, port))
+    return await asyncio.open_connection(sock=sock)
+
+
+def request_bytes(path):
+    return f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nConnection: close\r\n\r\n".encode()
+
+
+async def slow_download(port, path, hold, stats):
+    """Hold one download open for ``hold`` seconds, reading ~40 KB/s."""
+    start = time.perf_counter()
+    try:
+        reader, writer = await open_connection(port, rcvbuf=4096)
+    except OSError:
+        stats["refused"] += 1
+        return
+    try:
+        writer.write(request_bytes(path))
+        await writer.drain()
+        first = await asyncio.wait_for(reader.read(1), timeout=hold)
+        if not first:
+            return
+        stats["started"] += 1
+        stats["ttfb"].append(time.perf_counter() - start)
+        while time.perf_counter() - start < hold:
+            data = await reader.read(4096)
+            if not data:
+                stats["finished"] += 1
+                break
+            await asyncio.sleep(0.1)
+    except (asyncio.TimeoutError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+async def probe(port, path, timeout):
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(open_connection(port), timeout)
+        writer.write(request_bytes(path))
+        await writer.drain()
+        status = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+    except (asyncio.TimeoutError, OSError):
+        return None
+    if b" 200 " not in status:
+        return None
+    return time.perf_counter() - start
+
+
+async def run_level(port, download_path, probe_path, concurrency, hold):
+    stats = {"started": 0, "finished": 0, "refused": 0, "ttfb": []}
+    downloads = [
+        asyncio.create_task(slow_download(port, download_path, hold, stats))
+        for _ in range(concurrency)
+    ]
+    await asyncio.sleep(0.5)  # let the downloads occupy the server first
+
+    latencies = []
+    failed = 0
+    deadline = time.perf_counter() + hold - 1
+    while time.perf_counter() < deadline:
+        latency = await probe(port, probe_path, timeout=5)
+        if latency is None:
+            failed += 1
+        else:
+            latencies.append(latency)
+        await asyncio.sleep(0.25)
+
+    await asyncio.gather(*downloads)
+    return stats, latencies, failed
+
+
+def format_level(concurrency, stats, latencies, failed):
+    if latencies:
+        ordered = sorted(latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        probes = f"probe p50 {statistics.median(ordered) * 1000:7.1f} ms, p95 {p95 * 1000:7.1f} ms"
+    else:
+        probes = "probe p50       -      , p95       -     "
+    ttfb = f"{statistics.median(stats['ttfb']) * 1000:7.1f} ms" if stats["ttfb"] else "      -   "
+    return (f"  {concurrency:4d} slow clients: {stats['started']:4d} served "
+            f"(median TTFB {ttfb}), {probes}, {failed} probes failed/timed out")
+
+
+# ----------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------
+def prepare_record(port, rows):
+    base = f"http://{HOST}:{port}/api"
+    files = {"file": ("bench_load.csv", synthetic_csv(rows), "text/csv")}
+    response = requests.post(f"{base}/upload/", files=files, timeout=300)
+    response.raise_for_status()
+    record_id = requests.get(f"{base}/history/", timeout=30).json()[0]["id"]
+    # build the export cache so both servers stream the same file
+    requests.get(f"{base}/export/", params={"id": record_id, "fmt": "csv"}, timeout=300).raise_for_status()
+    return record_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--levels", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--hold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    servers = {}
+    bench_dir = tempfile.mkdtemp(prefix="async-load-")
+    try:
+        migrate(bench_dir)
+        for kind in ("wsgi", "asgi"):
+            port = free_port()
+            proc = start_server(kind, port, bench_dir)
+            if proc is None:
+                print(f"{kind}: server could not be started (is {'gunicorn' if kind == 'wsgi' else 'uvicorn'} installed?)")
+                continue
+            servers[kind] = (proc, port)
+
+        if "wsgi" not in servers:
+            sys.exit("The WSGI server is needed to upload the benchmark dataset.")
+        record_id = prepare_record(servers["wsgi"][1], args.rows)
+        print(f"dataset: {args.rows} rows (record {record_id}), hold {args.hold:.0f}s per level")
+
+        for kind, (_, port) in servers.items():
+            prefix = "/api" if kind == "wsgi" else "/api/async"
+            print(f"\n== {kind.upper()} ({prefix}/) ==")
+            for concurrency in args.levels:
+                result = asyncio.run(run_level(
+                    port,
+                    f"{prefix}/export/?id={record_id}&fmt=csv",
+                    f"{prefix}/history/",
+                    concurrency,
+                    args.hold,
+                ))
+                print(format_level(concurrency, *result))
+    finally:
+        for proc, _ in servers.values():
+            proc.terminate()
+            proc.wait()
+        shutil.rmtree(bench_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
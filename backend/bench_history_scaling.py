@@ -0,0 +1,133 @@
+"""Scaling test: per-user history latency as total uploads grow.
+
+Builds a throwaway SQLite database (the project database is not touched and
+the temporary one is deleted at exit), spreads uploads over many tenants and,
+after each growth step, times the real ``upload_history`` view for randomly
+chosen users. With the
+``(owner, uploaded_at)`` index the query is an index range scan of at most
+UPLOAD_HISTORY_RETENTION rows, so latency should stay flat from thousands to
+millions of rows. The SQLite query plan is printed to show the index in use.
+
+Usage (from the backend folder):
+
+    python bench_history_scaling.py [--steps 10000 100000 1000000] [--tenants 10000]
+"""
+import argparse
+import atexit
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+DB_DIR = tempfile.mkdtemp(prefix="history-scaling-")
+# a 1M-row run leaves hundreds of MB behind otherwise
+atexit.register(shutil.rmtree, DB_DIR, ignore_errors=True)
+settings.DATABASES["default"]["NAME"] = os.path.join(DB_DIR, "bench.sqlite3")
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+
+from equipment.models import UploadHistory  # noqa: E402
+from equipment.views import owned_uploads, upload_history  # noqa: E402
+
+BATCH = 50_000
+
+
+def create_tenants(count):
+    User = get_user_model()
+    User.objects.bulk_create(
+        [User(username=f"tenant{i}", password="!") for i in range(count)],
+        batch_size=BATCH,
+    )
+    return list(User.objects.order_by("id").values_list("id", flat=True))
+
+
+def insert_uploads(tenant_ids, start, count, rng):
+    """Insert ``count`` uploads with raw SQL (bulk_create would overwrite uploaded_at)."""
+    table = UploadHistory._meta.db_table
+    sql = (
+        f"INSERT INTO {table} (owner_id, filename, total_equipment, avg_flowrate, "
+        "avg_pressure, avg_temperature, uploaded_at) VALUES (%s, %s, %s, %s, %s, %s, %s)"
+    )
+    # naive UTC, the format Django stores datetimes in on SQLite
+    base = datetime(2026, 1, 1)
+    done = 0
+    while done < count:
+        size = min(BATCH, count - done)
+        rows = []
+        for i in range(start + done, start + done + size):
+            rows.append((
+                rng.choice(tenant_ids), f"upload_{i}.csv", 15,
+                120.5, 6.2, 110.3, (base + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            ))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+        done += size
+
+
+def time_history(tenant_ids, samples, rng):
+    User = get_user_model()
+    users = User.objects.in_bulk(rng.sample(tenant_ids, min(samples, len(tenant_ids))))
+    factory = APIRequestFactory()
+    latencies = []
+    for user in users.values():
+        request = factory.get("/api/history/")
+        force_authenticate(request, user=user)
+        start = time.perf_counter()
+        response = upload_history(request)
+        response.render()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+def query_plan(owner_id):
+    queryset = owned_uploads(owner_id).order_by("-uploaded_at")[:settings.UPLOAD_HISTORY_RETENTION]
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return "; ".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--tenants", type=int, default=10_000)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    call_command("migrate", verbosity=0)
+    tenant_ids = create_tenants(args.tenants)
+    print(f"database: {settings.DATABASES['default']['NAME']}")
+    print(f"tenants: {len(tenant_ids)}, samples per step: {args.samples}")
+    print(f"plan: {query_plan(tenant_ids[0])}\n")
+
+    total = 0
+    print(f"{'total uploads':>14} {'insert s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for step in sorted(args.steps):
+        start = time.perf_counter()
+        insert_uploads(tenant_ids, total, step - total, rng)
+        inserted = time.perf_counter() - start
+        total = step
+        p50, p95 = time_history(tenant_ids, args.samples, rng)
+        print(f"{total:>14,} {inserted:>9.1f} {p50 * 1000:>8.2f} {p95 * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
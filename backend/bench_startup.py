@@ -0,0 +1,176 @@
+"""Import-time and startup benchmark for the backend and the desktop app.
+
+Every measurement runs in a fresh interpreter so nothing is cached between
+runs:
+
+- ``python -X importtime`` breakdown of the Django app (``config.wsgi`` +
+  ``equipment.views``) and of ``desktop-app/main.py``, listing the slowest
+  top-level imports.
+- time-to-first-request: interpreter start -> first ``GET /api/history/``
+  answered by the WSGI application with a 200. It runs against a throwaway,
+  migrated SQLite database (the project database is not touched); any other
+  status counts as a failure.
+- time-to-first-window: interpreter start -> ``EquipmentApp`` shown and
+  painted (Qt ``offscreen`` platform, skipped when PyQt5 is missing).
+
+Usage (from the backend folder):
+
+    python bench_startup.py [--repeat 5] [--top 10]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+DESKTOP_DIR = BACKEND_DIR.parent / "desktop-app"
+
+BACKEND_IMPORTS = (
+    "import os; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings'); "
+    "import config.wsgi; import equipment.views"
+)
+DESKTOP_IMPORTS = "import main"
+
+# Point the child at the throwaway database before Django is set up, the
+# way bench_history_scaling.py does.
+USE_BENCH_DB = """
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+from django.conf import settings
+settings.DATABASES['default']['NAME'] = os.environ['BENCH_DB_NAME']
+"""
+
+MIGRATE = USE_BENCH_DB + """
+import django
+django.setup()
+from django.core.management import call_command
+call_command('migrate', verbosity=0)
+"""
+
+FIRST_REQUEST = USE_BENCH_DB + """
+import sys, time
+from wsgiref.util import setup_testing_defaults
+from config.wsgi import application
+
+environ = {'PATH_INFO': '/api/history/', 'REQUEST_METHOD': 'GET'}
+setup_testing_defaults(environ)
+status = []
+body = b''.join(application(environ, lambda s, h, e=None: status.append(s)))
+if not status[0].startswith('200'):
+    sys.exit(f'first request answered {status[0]}')
+print(time.time(), status[0])
+"""
+
+FIRST_WINDOW = """
+import sys, time
+from PyQt5.QtWidgets import QApplication
+from main import APP_STYLESHEET, EquipmentApp
+
+app = QApplication(sys.argv)
+app.setStyleSheet(APP_STYLESHEET)
+window = EquipmentApp()
+window.show()
+app.processEvents()
+print(time.time(), 'shown')
+"""
+
+
+def run_python(code, cwd, extra_args=(), extra_env=None):
+    env = dict(os.environ, **(extra_env or {}))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = str(cwd)
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+def import_times(code, cwd):
+    """Return ``(total_us, [(cumulative_us, module), ...])`` for top-level imports."""
+    proc = run_python(code, cwd, ("-X", "importtime"))
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    top_level = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        # nested imports are indented under their parent
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level.append((int(cumulative), name.strip()))
+    total = sum(us for us, _ in top_level)
+    return total, sorted(top_level, reverse=True)
+
+
+def time_to_ready(code, cwd, extra_env=None):
+    """Seconds from spawning the interpreter to the child printing its timestamp."""
+    start = time.time()
+    proc = run_python(code, cwd, extra_env=extra_env)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    ready_at, detail = proc.stdout.strip().splitlines()[-1].split(" ", 1)
+    return float(ready_at) - start, detail
+
+
+def report_imports(title, code, cwd, top):
+    print(f"\n== {title}: python -X importtime ==")
+    try:
+        total, modules = import_times(code, cwd)
+    except RuntimeError as e:
+        print(f"skipped ({e})")
+        return
+    print(f"total top-level import time: {total / 1000:.1f} ms")
+    for us, name in modules[:top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+
+def report_startup(title, code, cwd, repeat, extra_env=None):
+    print(f"\n== {title} ({repeat} runs) ==")
+    samples = []
+    for _ in range(repeat):
+        try:
+            seconds, detail = time_to_ready(code, cwd, extra_env)
+        except RuntimeError as e:
+            print(f"skipped ({e})")
+            return
+        samples.append(seconds * 1000)
+    print(f"median {statistics.median(samples):.1f} ms, "
+          f"min {min(samples):.1f} ms, max {max(samples):.1f} ms ({detail})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    report_imports("backend", BACKEND_IMPORTS, BACKEND_DIR, args.top)
+    report_imports("desktop app", DESKTOP_IMPORTS, DESKTOP_DIR, args.top)
+    db_dir = tempfile.mkdtemp(prefix="bench-startup-")
+    try:
+        bench_env = {"BENCH_DB_NAME": os.path.join(db_dir, "bench.sqlite3")}
+        proc = run_python(MIGRATE, BACKEND_DIR, extra_env=bench_env)
+        if proc.returncode != 0:
+            print("\n== time-to-first-request (GET /api/history/) ==")
+            print(f"skipped (migrate failed: {proc.stderr.strip().splitlines()[-1]})")
+        else:
+            report_startup("time-to-first-request (GET /api/history/)", FIRST_REQUEST,
+                           BACKEND_DIR, args.repeat, bench_env)
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+    report_startup("time-to-first-window (EquipmentApp.show)", FIRST_WINDOW, DESKTOP_DIR, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Settings for the load benchmarks (bench_async_load.py).
+
+Same as ``config.settings``, but the database and every media folder live in
+the throwaway directory named by ``EQUIPMENT_BENCH_DIR``, so a benchmark run
+never touches the project database, its uploads or their retention.
+"""
+import os
+from pathlib import Path
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+BENCH_DIR = Path(os.environ["EQUIPMENT_BENCH_DIR"])
+
+DATABASES['default']['NAME'] = BENCH_DIR / 'bench.sqlite3'
+MEDIA_ROOT = BENCH_DIR / 'media'
+DATASET_STORE_ROOT = MEDIA_ROOT / 'processed'
+CHUNKED_UPLOAD_ROOT = MEDIA_ROOT / 'chunked'
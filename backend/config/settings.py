@@ -71,6 +71,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # SQLite ignores select_for_update(); starting every transaction
+            # with the write lock serializes concurrent chunk PUTs instead of
+            # failing one of them with "database is locked"
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -104,6 +111,34 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# ---------------- MEDIA / DATASET STORE ----------------
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Cleaned uploads are kept as columnar chunks so exports can be streamed
+# with constant memory (see equipment/utils/dataset_store.py).
+DATASET_STORE_ROOT = MEDIA_ROOT / 'processed'
+DATASET_CHUNK_ROWS = 50_000
+
+# Build the CSV, csv.gz and Parquet exports of every upload in the background
+# right after it is stored, so Range resumes never wait for a full build
+EXPORT_PREBUILD = True
+
+# Resumable chunked uploads (POST /api/upload/chunked/ ...)
+CHUNKED_UPLOAD_ROOT = MEDIA_ROOT / 'chunked'
+CHUNKED_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_AGE_HOURS = 24
+
+# Uploads kept per owner (each user, plus one shared anonymous bucket)
+UPLOAD_HISTORY_RETENTION = 5
+
+# Large uploads only return the first rows in "table_data"
+TABLE_PREVIEW_ROWS = 1000
+
+# GET /api/rows/ paging
+ROWS_PAGE_SIZE = 100
+ROWS_MAX_PAGE_SIZE = 1000
+
+
 # ---------------- DRF AUTH ----------------
 # For this mini-project / local usage we allow unauthenticated access so the
 # desktop app can call the API without sending credentials. If you want to
@@ -3,5 +3,7 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # async read endpoints; ASGI-only (config/asgi.py), they answer 404 under WSGI
+    path('api/async/', include('equipment.async_urls')),
     path('api/', include('equipment.urls')),
 ]
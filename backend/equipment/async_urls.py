@@ -0,0 +1,9 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('history/', async_views.upload_history),
+    path('rows/', async_views.dataset_rows),
+    path('download-pdf/', async_views.download_pdf),
+    path('export/', async_views.export_dataset),
+]
@@ -0,0 +1,219 @@
+"""Async versions of the read endpoints, mounted under /api/async/.
+
+They use the async ORM and stream files without blocking the event loop, so
+under an ASGI server (``uvicorn config.asgi:application``) a slow client
+downloading a report or export no longer holds a worker thread. CPU-bound
+work (pandas, reportlab) runs in a worker thread via ``asyncio.to_thread``.
+
+The routes are ASGI-only: under WSGI every async iterator would be read into
+memory by ``async_to_sync`` before the first byte goes out, so ``asgi_only``
+answers 404 there and WSGI clients use the ``/api/`` views instead.
+
+Responses have the same shape as the DRF views in ``views.py`` and are scoped
+to the same owner: the user found by DRF's DEFAULT_AUTHENTICATION_CLASSES,
+otherwise the shared anonymous bucket.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .models import UploadHistory
+from .utils.dataset_store import has_dataset
+from .utils.export import (
+    BLOCK_SIZE,
+    EXPORT_FORMATS,
+    aiter_file_range,
+    aiter_sync,
+    build_export,
+    export_etag,
+    export_filename,
+    export_param_error,
+    export_path,
+    file_response,
+    iter_export,
+    tee_to_file,
+)
+from .views import history_entry, owned_uploads, page_params, rows_page
+
+
+def asgi_only(view):
+    """Serve ``view`` only when the request came in through the ASGI handler."""
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                {"error": "This endpoint is only served over ASGI; use /api/ instead"},
+                status=404,
+            )
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class _Unauthorized(Exception):
+    pass
+
+
+def _authenticators():
+    return [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+
+def _authenticate(request):
+    # DRF's own authentication, so both stacks resolve the same owner
+    user = Request(request, authenticators=_authenticators()).user
+    return user if user.is_authenticated else None
+
+
+async def _request_owner(request):
+    """Async counterpart of ``views.request_owner``."""
+    try:
+        return await sync_to_async(_authenticate)(request)
+    except AuthenticationFailed as e:
+        raise _Unauthorized(str(e.detail))
+
+
+def _unauthorized(request, message):
+    response = JsonResponse({"detail": message}, status=401)
+    authenticators = _authenticators()
+    if authenticators:
+        header = authenticators[0].authenticate_header(request)
+        if header:
+            response["WWW-Authenticate"] = header
+    return response
+
+
+async def _get_record(request, record_id):
+    owner = await _request_owner(request)
+    try:
+        return await owned_uploads(owner).aget(id=record_id)
+    except (UploadHistory.DoesNotExist, ValueError):
+        return None
+
+
+async def _aiter_buffer(buffer):
+    while True:
+        data = buffer.read(BLOCK_SIZE)
+        if not data:
+            break
+        yield data
+
+
+@asgi_only
+@require_GET
+async def upload_history(request):
+    try:
+        owner = await _request_owner(request)
+    except _Unauthorized as e:
+        return _unauthorized(request, str(e))
+    history = [
+        history_entry(h)
+        async for h in owned_uploads(owner).order_by('-uploaded_at')[:settings.UPLOAD_HISTORY_RETENTION]
+    ]
+    return JsonResponse(history, safe=False)
+
+
+@asgi_only
+@require_GET
+async def dataset_rows(request):
+    record_id = request.GET.get("id")
+    if not record_id:
+        return JsonResponse({"error": "Missing ID"}, status=400)
+    try:
+        page, page_size = page_params(request)
+    except ValueError:
+        return JsonResponse({"error": "page and page_size must be integers"}, status=400)
+
+    try:
+        record = await _get_record(request, record_id)
+    except _Unauthorized as e:
+        return _unauthorized(request, str(e))
+    if record is None:
+        return JsonResponse({"error": "Record not found"}, status=404)
+
+    data = await asyncio.to_thread(rows_page, record, page, page_size)
+    return JsonResponse(data)
+
+
+@asgi_only
+@require_GET
+async def download_pdf(request):
+    record_id = request.GET.get("id")
+    if not record_id:
+        return HttpResponse("Missing ID", status=400)
+
+    try:
+        record = await _get_record(request, record_id)
+    except _Unauthorized as e:
+        return _unauthorized(request, str(e))
+    if record is None:
+        return HttpResponse("Record not found", status=404)
+
+    from .utils.pdf_report import record_pdf
+
+    buffer = await asyncio.to_thread(record_pdf, record)
+    response = StreamingHttpResponse(_aiter_buffer(buffer), content_type='application/pdf')
+    response['Content-Length'] = str(buffer.getbuffer().nbytes)
+    response['Content-Disposition'] = f'attachment; filename="{record.filename}.pdf"'
+    return response
+
+
+@asgi_only
+@require_GET
+async def export_dataset(request):
+    record_id = request.GET.get("id")
+    fmt = request.GET.get("fmt", "csv")
+    part = request.GET.get("part", "dataset")
+    if not record_id:
+        return JsonResponse({"error": "Missing ID"}, status=400)
+    param_error = export_param_error(fmt, part)
+    if param_error:
+        return JsonResponse({"error": param_error[0]}, status=param_error[1])
+
+    try:
+        record = await _get_record(request, record_id)
+    except _Unauthorized as e:
+        return _unauthorized(request, str(e))
+    if record is None:
+        return JsonResponse({"error": "Record not found"}, status=404)
+    if not await asyncio.to_thread(has_dataset, record.id):
+        return JsonResponse({"error": "No stored dataset for this record"}, status=404)
+
+    content_type = EXPORT_FORMATS[fmt][0]
+    etag = export_etag(record, fmt, part)
+    range_header = request.META.get("HTTP_RANGE")
+
+    path = export_path(record.id, fmt, part)
+    if range_header:
+        # Resuming needs the finished file, normally prebuilt at upload time
+        # (see views.export_dataset).
+        await asyncio.to_thread(build_export, record.id, fmt, part)
+
+    if await asyncio.to_thread(path.exists):
+        response = file_response(
+            path,
+            content_type,
+            range_header,
+            request.META.get("HTTP_IF_RANGE"),
+            etag,
+            reader=aiter_file_range,
+        )
+    else:
+        # First download: stream straight from the chunks and keep a copy,
+        # producing each block in a worker thread.
+        response = StreamingHttpResponse(
+            aiter_sync(tee_to_file(iter_export(record.id, fmt, part), path)),
+            content_type=content_type,
+        )
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Content-Disposition"] = f'attachment; filename="{export_filename(record, fmt, part)}"'
+    return response
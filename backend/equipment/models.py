@@ -1,6 +1,18 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 
 class UploadHistory(models.Model):
+    # NULL owner = anonymous uploads (the API allows unauthenticated access);
+    # they share one bucket, every authenticated user gets their own.
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='uploads',
+    )
     filename = models.CharField(max_length=255)
     total_equipment = models.IntegerField()
     avg_flowrate = models.FloatField()
@@ -8,5 +20,49 @@ class UploadHistory(models.Model):
     avg_temperature = models.FloatField()
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # history / retention: WHERE owner_id = ? ORDER BY uploaded_at DESC LIMIT n
+            models.Index(fields=['owner', '-uploaded_at'], name='upload_owner_uploaded_idx'),
+        ]
+
     def __str__(self):
         return self.filename
+
+
+class UploadSession(models.Model):
+    """State of a resumable, chunked CSV upload (see views.chunked_upload_*)."""
+
+    STATUS_ACTIVE = 'active'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Active'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+    )
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    received_bytes = models.BigIntegerField(default=0)
+    # bytes of the file already parsed into dataset chunks (always on a line boundary)
+    parsed_bytes = models.BigIntegerField(default=0)
+    chunks_written = models.IntegerField(default=0)
+    header = models.TextField(blank=True)
+    stats = models.JSONField(default=dict)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    error = models.TextField(blank=True)
+    history = models.ForeignKey(UploadHistory, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
@@ -1,3 +1,593 @@
-from django.test import TestCase
+import base64
+import gzip
+import hashlib
+import io
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .models import UploadHistory
+from .utils import chunked_upload
+from .utils.dataset_store import has_dataset
+from .utils.export import export_path, parse_range
+
+SAMPLE_CSV = (
+    b"Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+    b"Pump-1,Pump,12,5,120\n"
+    b"Valve-1,Valve,8,3,90\n"
+    b"Pump-2,Pump,14,6,130\n"
+    b"Reactor-1,Reactor,20,10,250\n"
+    b"Valve-2,Valve,9,4,95\n"
+    b"Pump-3,Pump,13,5.5,125\n"
+    b"Reactor-2,Reactor,22,11,260\n"
+)
+
+
+class MediaTestCase(TestCase):
+    """Runs every test against throwaway dataset / chunked-upload directories."""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        overrides = override_settings(
+            DATASET_STORE_ROOT=f"{media}/processed",
+            CHUNKED_UPLOAD_ROOT=f"{media}/chunked",
+            # several chunks even for the small sample
+            DATASET_CHUNK_ROWS=3,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def upload(self, content=SAMPLE_CSV, name="sample.csv", **extra):
+        response = self.client.post(
+            "/api/upload/", {"file": SimpleUploadedFile(name, content, "text/csv")}, **extra
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def start_chunked(self, content, name="sample.csv", **extra):
+        response = self.client.post(
+            "/api/upload/chunked/", {"filename": name, "total_size": len(content)}, **extra
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()["upload_id"]
+
+    def put_chunk(self, upload_id, offset, data, checksum=None, **extra):
+        checksum = checksum or hashlib.sha256(data).hexdigest()
+        return self.client.put(
+            f"/api/upload/chunked/{upload_id}/?offset={offset}",
+            data,
+            content_type="application/octet-stream",
+            HTTP_X_CHUNK_CHECKSUM=f"sha256={checksum}",
+            **extra,
+        )
+
+    def finalize(self, upload_id, **extra):
+        return self.client.post(f"/api/upload/chunked/{upload_id}/finalize/", **extra)
+
+    def upload_chunked(self, parts, **extra):
+        """Upload ``parts`` as consecutive chunks and finalize; returns the summary."""
+        upload_id = self.start_chunked(b"".join(parts), **extra)
+        offset = 0
+        for part in parts:
+            response = self.put_chunk(upload_id, offset, part, **extra)
+            self.assertEqual(response.status_code, 200, response.content)
+            offset += len(part)
+        response = self.finalize(upload_id, **extra)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def latest_id(self, **extra):
+        return self.client.get("/api/history/", **extra).json()[0]["id"]
+
+    async def adownload(self, path, **extra):
+        response = await self.async_client.get(path, **extra)
+        if not response.streaming:
+            return response, response.content
+        return response, b"".join([chunk async for chunk in response.streaming_content])
+
+    def download(self, path, **extra):
+        response = self.client.get(path, **extra)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_explicit_and_open_ended(self):
+        self.assertEqual(parse_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(parse_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=90-500", 100), (90, 99))
+
+    def test_suffix(self):
+        self.assertEqual(parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=-500", 100), (0, 99))
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=100-", "bytes=150-160", "bytes=10-5", "bytes=-0"):
+            with self.assertRaises(ValueError, msg=header):
+                parse_range(header, 100)
+
+    def test_ignored(self):
+        for header in (None, "", "bytes=-", "items=0-9", "bytes=0-1,5-6"):
+            self.assertIsNone(parse_range(header, 100), header)
+
+
+class ExportTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.upload()
+        self.record_id = self.latest_id()
+        self.expected = pd.read_csv(io.BytesIO(SAMPLE_CSV))
+
+    def export(self, fmt, part="dataset", **extra):
+        response, body = self.download(
+            f"/api/export/?id={self.record_id}&fmt={fmt}&part={part}", **extra
+        )
+        self.assertIn(response.status_code, (200, 206), body)
+        return response, body
+
+    def assert_dataset(self, df):
+        pd.testing.assert_frame_equal(
+            df.astype({"Equipment Name": object, "Type": object}),
+            self.expected.astype({"Flowrate": float, "Pressure": float, "Temperature": float}),
+            check_dtype=False,
+        )
+
+    def test_csv_round_trip(self):
+        _, body = self.export("csv")
+        self.assert_dataset(pd.read_csv(io.BytesIO(body)))
+
+    def test_gzip_round_trip(self):
+        response, body = self.export("csv.gz")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assert_dataset(pd.read_csv(io.BytesIO(gzip.decompress(body))))
+
+    def test_parquet_round_trip(self):
+        _, body = self.export("parquet")
+        self.assert_dataset(pd.read_parquet(io.BytesIO(body)))
+
+    def test_aggregates_round_trip(self):
+        for fmt, read in (
+            ("csv", lambda body: pd.read_csv(io.BytesIO(body))),
+            ("csv.gz", lambda body: pd.read_csv(io.BytesIO(gzip.decompress(body)))),
+            ("parquet", lambda body: pd.read_parquet(io.BytesIO(body))),
+        ):
+            _, body = self.export(fmt, part="aggregates")
+            df = read(body).set_index("Type")
+            self.assertEqual(df.loc["Pump", "count"], 3, fmt)
+            self.assertEqual(df.loc["Valve", "count"], 2, fmt)
+            self.assertAlmostEqual(df.loc["Pump", "avg_flowrate"], 13.0, msg=fmt)
+            self.assertAlmostEqual(df.loc["Valve", "avg_pressure"], 3.5, msg=fmt)
+
+    def test_cached_export_is_byte_identical(self):
+        _, first = self.export("csv.gz")
+        response, second = self.export("csv.gz")
+        self.assertEqual(first, second)
+        self.assertEqual(int(response["Content-Length"]), len(first))
+
+    def test_range_resume(self):
+        _, full = self.export("csv")
+        response, body = self.export("csv", HTTP_RANGE="bytes=10-")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, full[10:])
+        self.assertEqual(response["Content-Range"], f"bytes 10-{len(full) - 1}/{len(full)}")
+
+        response, body = self.export("csv", HTTP_RANGE="bytes=-5")
+        self.assertEqual(body, full[-5:])
+
+    def test_range_on_cold_cache(self):
+        response, body = self.export("parquet", HTTP_RANGE="bytes=0-3")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, b"PAR1")
+
+    def test_unsatisfiable_range(self):
+        _, full = self.export("csv")
+        response = self.client.get(
+            f"/api/export/?id={self.record_id}&fmt=csv", HTTP_RANGE=f"bytes={len(full)}-"
+        )
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(full)}")
+
+    def test_if_range_mismatch_sends_full_body(self):
+        response, full = self.export("csv")
+        etag = response["ETag"]
+
+        response, body = self.export("csv", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, full[:10])
+
+        response, body = self.export("csv", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, full)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get("/api/export/").status_code, 400)
+        self.assertEqual(self.client.get(f"/api/export/?id={self.record_id}&fmt=xlsx").status_code, 400)
+        self.assertEqual(self.client.get(f"/api/export/?id={self.record_id}&part=x").status_code, 400)
+        self.assertEqual(self.client.get("/api/export/?id=999999").status_code, 404)
+
+
+class ChunkedUploadTests(MediaTestCase):
+    def test_extra_columns_keep_one_schema_across_chunks(self):
+        # "Tag" looks numeric in the first chunk and textual in the second
+        header = b"Equipment Name,Type,Flowrate,Pressure,Temperature,Tag\n"
+        summary = self.upload_chunked([
+            header + b"Pump-1,Pump,12,5,120,7\nPump-2,Pump,14,6,130,007\n",
+            b"Valve-1,Valve,8,3,90,abc\n",
+        ])
+
+        response, body = self.download(f"/api/export/?id={summary['id']}&fmt=parquet")
+        self.assertEqual(response.status_code, 200)
+        df = pd.read_parquet(io.BytesIO(body))
+        self.assertEqual(df["Tag"].tolist(), ["7", "007", "abc"])
+        self.assertEqual(df["Flowrate"].tolist(), [12.0, 14.0, 8.0])
+
+    def test_column_without_valid_values_is_rejected(self):
+        content = b"Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,12,,120\nPump-2,Pump,14,n/a,130\n"
+        upload_id = self.start_chunked(content)
+        self.assertEqual(self.put_chunk(upload_id, 0, content).status_code, 200)
+
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "No valid values in column: Pressure")
+        self.assertEqual(response.json()["status"], "failed")
+        self.assertEqual(self.client.get("/api/history/").json(), [])
+
+        # the one-shot upload applies the same rule
+        response = self.client.post(
+            "/api/upload/", {"file": SimpleUploadedFile("sample.csv", content, "text/csv")}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "No valid values in column: Pressure")
+
+    def test_one_shot_and_chunked_summaries_agree(self):
+        content = (
+            b"Equipment Name,Type,Flowrate,Pressure,Temperature,Tag\n"
+            b"Pump-1,Pump,abc,5,120,007\n"
+            b"Pump-2, Pump ,14,,130,x\n"
+            b"Valve-1,Valve,8,3,n/a,\n"
+        )
+        chunked = self.upload_chunked([content[:70], content[70:]])
+        one_shot = self.upload(content)
+        for key in ("total_equipment", "average_flowrate", "average_pressure",
+                    "average_temperature", "equipment_type_distribution", "table_data"):
+            self.assertEqual(one_shot[key], chunked[key], key)
+        self.assertEqual(one_shot["average_flowrate"], 11.0)
+        self.assertEqual(one_shot["table_data"][0]["Flowrate"], None)
+        self.assertEqual(one_shot["table_data"][0]["Tag"], "007")
+
+    def test_header_that_is_not_utf8_fails_the_session(self):
+        content = b"Equipment Name,Type,Flowrate,Pressure,Temperature,D\xe9bit\nPump-1,Pump,12,5,120,1\n"
+        upload_id = self.start_chunked(content)
+        response = self.put_chunk(upload_id, 0, content)
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()["error"].startswith("Invalid header"))
+        self.assertEqual(response.json()["status"], "failed")
+        # a retry is told the session failed instead of hitting the same error
+        self.assertEqual(self.put_chunk(upload_id, 0, content).status_code, 409)
+
+    def test_offset_mismatch_returns_resume_point(self):
+        upload_id = self.start_chunked(SAMPLE_CSV)
+        first, rest = SAMPLE_CSV[:40], SAMPLE_CSV[40:]
+        self.assertEqual(self.put_chunk(upload_id, 0, first).status_code, 200)
+
+        # a retried chunk whose first attempt did land
+        response = self.put_chunk(upload_id, 0, first)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], len(first))
+        # a chunk from past the current offset
+        self.assertEqual(self.put_chunk(upload_id, len(SAMPLE_CSV) - 5, rest[-5:]).status_code, 409)
+
+        status = self.client.get(f"/api/upload/chunked/{upload_id}/").json()
+        self.assertEqual(status["offset"], len(first))
+        self.assertEqual(self.put_chunk(upload_id, status["offset"], rest).status_code, 200)
+        self.assertEqual(self.finalize(upload_id).json()["total_equipment"], 7)
+
+    def test_retry_that_loses_the_race_is_not_applied_twice(self):
+        upload_id = self.start_chunked(SAMPLE_CSV)
+        receive_chunk = chunked_upload.receive_chunk
+
+        def slow_receive(*args):
+            # while this body is still being received, a retry lands first
+            with mock.patch("equipment.views.receive_chunk", receive_chunk):
+                self.assertEqual(self.put_chunk(upload_id, 0, SAMPLE_CSV).status_code, 200)
+            return receive_chunk(*args)
+
+        with mock.patch("equipment.views.receive_chunk", slow_receive):
+            response = self.put_chunk(upload_id, 0, SAMPLE_CSV)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], len(SAMPLE_CSV))
+        self.assertEqual(list(chunked_upload.session_dir(upload_id).glob("incoming-*")), [])
+        self.assertEqual(self.finalize(upload_id).json()["total_equipment"], 7)
+
+    def test_checksum_mismatch_is_rejected_and_can_be_resent(self):
+        upload_id = self.start_chunked(SAMPLE_CSV)
+        response = self.put_chunk(upload_id, 0, SAMPLE_CSV, checksum="0" * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Checksum mismatch")
+        self.assertEqual(response.json()["offset"], 0)
+
+        response = self.client.put(
+            f"/api/upload/chunked/{upload_id}/?offset=0",
+            SAMPLE_CSV,
+            content_type="application/octet-stream",
+            HTTP_X_CHUNK_CHECKSUM="md5=abc",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(list(chunked_upload.session_dir(upload_id).glob("incoming-*")), [])
+        self.assertEqual(self.put_chunk(upload_id, 0, SAMPLE_CSV).status_code, 200)
+        self.assertEqual(self.finalize(upload_id).status_code, 200)
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        upload_id = self.start_chunked(SAMPLE_CSV)
+        self.put_chunk(upload_id, 0, SAMPLE_CSV[:40])
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["status"], "active")
+
+    def test_finalize_is_idempotent(self):
+        upload_id = self.start_chunked(SAMPLE_CSV)
+        self.put_chunk(upload_id, 0, SAMPLE_CSV[:50])
+        self.put_chunk(upload_id, 50, SAMPLE_CSV[50:])
+
+        first = self.finalize(upload_id)
+        second = self.finalize(upload_id)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(len(self.client.get("/api/history/").json()), 1)
+
+        summary = first.json()
+        self.assertEqual(summary["total_equipment"], 7)
+        self.assertEqual(summary["average_flowrate"], 14.0)
+        self.assertEqual(summary["equipment_type_distribution"], {"Pump": 3, "Valve": 2, "Reactor": 2})
+        self.assertEqual(len(summary["table_data"]), 7)
+        self.assertFalse(summary["table_data_truncated"])
+
+        # a finished session accepts no more chunks
+        self.assertEqual(self.put_chunk(upload_id, len(SAMPLE_CSV), b"x").status_code, 409)
+
+    def test_chunked_and_one_shot_uploads_store_the_same_dataset(self):
+        summary = self.upload_chunked([SAMPLE_CSV[:33], SAMPLE_CSV[33:90], SAMPLE_CSV[90:]])
+        self.upload()
+        one_shot_id = self.latest_id()
+
+        _, chunked = self.download(f"/api/export/?id={summary['id']}&fmt=csv")
+        _, one_shot = self.download(f"/api/export/?id={one_shot_id}&fmt=csv")
+        self.assertEqual(chunked, one_shot)
+
+
+class ExportPrebuildTests(MediaTestCase):
+    def run_prebuild(self, callbacks):
+        for callback in callbacks:
+            thread = callback()
+            if thread is not None:
+                thread.join()
+
+    def assert_prebuilt(self, record_id):
+        for fmt in ("csv", "csv.gz", "parquet"):
+            for part in ("dataset", "aggregates"):
+                self.assertTrue(export_path(record_id, fmt, part).exists(), (fmt, part))
+
+    def test_upload_prebuilds_every_export(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            record_id = self.upload()["id"]
+        self.run_prebuild(callbacks)
+        self.assert_prebuilt(record_id)
+
+        # a resume is served from the prebuilt file with its full size known
+        full = export_path(record_id, "csv.gz", "dataset").read_bytes()
+        response, body = self.download(f"/api/export/?id={record_id}&fmt=csv.gz", HTTP_RANGE="bytes=20-")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 20-{len(full) - 1}/{len(full)}")
+        self.assertEqual(body, full[20:])
+
+    def test_chunked_finalize_prebuilds_every_export(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            record_id = self.upload_chunked([SAMPLE_CSV[:60], SAMPLE_CSV[60:]])["id"]
+        self.run_prebuild(callbacks)
+        self.assert_prebuilt(record_id)
+
+    @override_settings(EXPORT_PREBUILD=False)
+    def test_prebuild_can_be_disabled(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            record_id = self.upload()["id"]
+        self.run_prebuild(callbacks)
+        self.assertFalse(export_path(record_id, "csv", "dataset").exists())
+
+
+class ChartDataTests(MediaTestCase):
+    def test_histograms_cover_every_chunk(self):
+        record_id = self.upload()["id"]
+        data = self.client.get(f"/api/chart-data/?id={record_id}").json()
+
+        self.assertEqual(data["total_rows"], 7)
+        self.assertEqual(data["equipment_type_distribution"], {"Pump": 3, "Valve": 2, "Reactor": 2})
+        for col in ("Flowrate", "Pressure", "Temperature"):
+            histogram = data["histograms"][col]
+            self.assertEqual(sum(histogram["counts"]), 7, col)
+            self.assertEqual(len(histogram["edges"]), len(histogram["counts"]) + 1)
+            self.assertEqual(sorted(data["sample"][col]), sorted(pd.read_csv(io.BytesIO(SAMPLE_CSV))[col]))
+        flowrate = data["histograms"]["Flowrate"]["edges"]
+        self.assertLessEqual(flowrate[0], 8)
+        self.assertGreaterEqual(flowrate[-1], 22)
+
+    @override_settings(DATASET_CHUNK_ROWS=100)
+    def test_sample_is_capped_and_spans_all_chunks(self):
+        rows = "".join(f"Unit-{i},Pump,{i},1,1\n" for i in range(12_000))
+        content = b"Equipment Name,Type,Flowrate,Pressure,Temperature\n" + rows.encode()
+        record_id = self.upload(content)["id"]
+
+        data = self.client.get(f"/api/chart-data/?id={record_id}").json()
+        self.assertEqual(sum(data["histograms"]["Flowrate"]["counts"]), 12_000)
+        sample = data["sample"]["Flowrate"]
+        self.assertEqual(len(sample), 5000)
+        self.assertEqual(len(set(sample)), 5000)
+        # rows from the first, middle and last chunks all get picked
+        self.assertLess(min(sample), 100)
+        self.assertGreater(max(sample), 11_900)
+
+    def test_invalid_parameters(self):
+        record_id = self.upload()["id"]
+        self.assertEqual(self.client.get("/api/chart-data/").status_code, 400)
+        self.assertEqual(self.client.get(f"/api/chart-data/?id={record_id + 1}").status_code, 404)
+
+
+class AsyncExportTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.upload()
+        self.record_id = self.latest_id()
+
+    async def test_cold_cache_streams_and_keeps_a_copy(self):
+        path = export_path(self.record_id, "csv.gz", "dataset")
+        response, body = await self.adownload(f"/api/async/export/?id={self.record_id}&fmt=csv.gz")
+        self.assertEqual(response.status_code, 200)
+        # streamed from the chunks: no length known up front
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertTrue(path.exists())
+        self.assertEqual(path.read_bytes(), body)
+
+        _, sync_body = await sync_to_async(self.download)(
+            f"/api/export/?id={self.record_id}&fmt=csv.gz"
+        )
+        self.assertEqual(body, sync_body)
+
+    async def test_range_builds_the_cache_first(self):
+        _, full = await sync_to_async(self.download)(f"/api/export/?id={self.record_id}&fmt=csv")
+        export_path(self.record_id, "csv", "dataset").unlink()
+
+        response, body = await self.adownload(
+            f"/api/async/export/?id={self.record_id}&fmt=csv", headers={"Range": "bytes=5-"}
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, full[5:])
+
+    def test_async_routes_are_not_served_over_wsgi(self):
+        for path in ("history/", "rows/", "download-pdf/", f"export/?id={self.record_id}"):
+            response = self.client.get(f"/api/async/{path}")
+            self.assertEqual(response.status_code, 404, path)
+
+
+def basic_auth(username, password="secret"):
+    token = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return f"Basic {token}"
+
+
+@override_settings(
+    UPLOAD_HISTORY_RETENTION=2,
+    # Basic auth checks the password on every request
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class OwnershipTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        User.objects.create_user("alice", password="secret")
+        User.objects.create_user("bob", password="secret")
+        self.alice = {"HTTP_AUTHORIZATION": basic_auth("alice")}
+        self.bob = {"HTTP_AUTHORIZATION": basic_auth("bob")}
+
+    def test_uploads_are_private_to_their_owner(self):
+        alice_id = self.upload(name="alice.csv", **self.alice)["id"]
+        bob_id = self.upload(name="bob.csv", **self.bob)["id"]
+        anonymous_id = self.upload(name="anonymous.csv")["id"]
+
+        for auth, own_id, filename in (
+            (self.alice, alice_id, "alice.csv"),
+            (self.bob, bob_id, "bob.csv"),
+            ({}, anonymous_id, "anonymous.csv"),
+        ):
+            history = self.client.get("/api/history/", **auth).json()
+            self.assertEqual([h["filename"] for h in history], [filename])
+            for other_id in {alice_id, bob_id, anonymous_id} - {own_id}:
+                for path in ("rows", "download-pdf", "export", "chart-data"):
+                    response = self.client.get(f"/api/{path}/?id={other_id}", **auth)
+                    self.assertEqual(response.status_code, 404, (filename, path))
+            self.assertEqual(self.client.get(f"/api/rows/?id={own_id}", **auth).status_code, 200)
+
+    def test_bad_credentials_are_rejected(self):
+        response = self.client.get("/api/history/", HTTP_AUTHORIZATION=basic_auth("alice", "wrong"))
+        self.assertEqual(response.status_code, 401)
+
+    def test_chunked_sessions_are_private(self):
+        upload_id = self.start_chunked(SAMPLE_CSV, **self.alice)
+        self.assertEqual(self.client.get(f"/api/upload/chunked/{upload_id}/", **self.bob).status_code, 404)
+        self.assertEqual(self.put_chunk(upload_id, 0, SAMPLE_CSV, **self.bob).status_code, 404)
+        self.assertEqual(self.finalize(upload_id, **self.bob).status_code, 404)
+
+        self.assertEqual(self.put_chunk(upload_id, 0, SAMPLE_CSV, **self.alice).status_code, 200)
+        self.assertEqual(self.finalize(upload_id, **self.alice).status_code, 200)
+        self.assertEqual(len(self.client.get("/api/history/", **self.alice).json()), 1)
+        self.assertEqual(self.client.get("/api/history/", **self.bob).json(), [])
+
+    def test_retention_is_per_owner(self):
+        alice_ids = [self.upload(name=f"alice{i}.csv", **self.alice)["id"] for i in range(3)]
+        bob_id = self.upload(name="bob.csv", **self.bob)["id"]
+        # a chunked upload counts against the same limit
+        alice_ids.append(self.upload_chunked([SAMPLE_CSV], **self.alice)["id"])
+
+        history = self.client.get("/api/history/", **self.alice).json()
+        self.assertEqual([h["id"] for h in history], alice_ids[:1:-1])
+        for old_id in alice_ids[:2]:
+            self.assertFalse(UploadHistory.objects.filter(id=old_id).exists())
+            self.assertFalse(has_dataset(old_id))
+        # bob's single upload is untouched by alice's retention
+        self.assertEqual([h["id"] for h in self.client.get("/api/history/", **self.bob).json()], [bob_id])
+        self.assertTrue(has_dataset(bob_id))
+
+    async def test_async_views_are_scoped_to_the_owner(self):
+        alice_id = (await sync_to_async(self.upload)(name="alice.csv", **self.alice))["id"]
+        bob_id = (await sync_to_async(self.upload)(name="bob.csv", **self.bob))["id"]
+        alice = {"Authorization": basic_auth("alice")}
+
+        response = await self.async_client.get("/api/async/history/", headers=alice)
+        self.assertEqual([h["id"] for h in response.json()], [alice_id])
+        response = await self.async_client.get("/api/async/history/")
+        self.assertEqual(response.json(), [])
+
+        for path in ("rows", "download-pdf", "export"):
+            response = await self.async_client.get(f"/api/async/{path}/?id={bob_id}", headers=alice)
+            self.assertEqual(response.status_code, 404, path)
+        response = await self.async_client.get(f"/api/async/rows/?id={alice_id}", headers=alice)
+        self.assertEqual(response.json()["total_rows"], 7)
+
+        response = await self.async_client.get(
+            "/api/async/history/", headers={"Authorization": basic_auth("alice", "wrong")}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_both_stacks_resolve_the_same_owner(self):
+        await sync_to_async(self.upload)(name="alice.csv", **self.alice)
+        anonymous_id = (await sync_to_async(self.upload)(name="anonymous.csv"))["id"]
+
+        # a session cookie (e.g. from /admin/) is not an API credential on either stack
+        alice = await get_user_model().objects.aget(username="alice")
+        await self.async_client.aforce_login(alice)
+        response = await self.async_client.get("/api/async/history/")
+        self.assertEqual([h["id"] for h in response.json()], [anonymous_id])
+        await sync_to_async(self.client.force_login)(alice)
+        response = await sync_to_async(self.client.get)("/api/history/")
+        self.assertEqual([h["id"] for h in response.json()], [anonymous_id])
+
+        response = await self.async_client.get(
+            "/api/async/history/", headers={"Authorization": basic_auth("alice", "wrong")}
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], 'Basic realm="api"')
+
+    async def test_async_history_applies_retention(self):
+        for i in range(3):
+            await sync_to_async(self.upload)(name=f"alice{i}.csv", **self.alice)
+        response = await self.async_client.get(
+            "/api/async/history/", headers={"Authorization": basic_auth("alice")}
+        )
+        self.assertEqual([h["filename"] for h in response.json()], ["alice2.csv", "alice1.csv"])
@@ -1,8 +1,24 @@
 from django.urls import path
-from .views import upload_csv, upload_history, download_pdf
+from .views import (
+    upload_csv,
+    upload_history,
+    download_pdf,
+    export_dataset,
+    dataset_rows,
+    dataset_chart_data,
+    chunked_upload_init,
+    chunked_upload_chunk,
+    chunked_upload_finalize,
+)
 
 urlpatterns = [
     path('upload/', upload_csv),
+    path('upload/chunked/', chunked_upload_init),
+    path('upload/chunked/<uuid:upload_id>/', chunked_upload_chunk),
+    path('upload/chunked/<uuid:upload_id>/finalize/', chunked_upload_finalize),
     path('history/', upload_history),
+    path('rows/', dataset_rows),
+    path('chart-data/', dataset_chart_data),
     path('download-pdf/', download_pdf),
+    path('export/', export_dataset),
 ]
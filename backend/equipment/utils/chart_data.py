@@ -0,0 +1,111 @@
+import json
+import math
+import os
+import uuid
+
+from .dataset_store import NUMERIC_COLUMNS, dataset_dir, iter_chunks
+
+HISTOGRAM_BINS = 30
+SAMPLE_SIZE = 5000
+
+
+def chart_data_path(record_id):
+    return dataset_dir(record_id) / "chart_data.json"
+
+
+def nice_ceiling(value):
+    """Smallest 1/2/2.5/5 x 10^n that is >= value."""
+    if value <= 0 or not math.isfinite(value):
+        return 1.0
+    exponent = 10 ** math.floor(math.log10(value))
+    for factor in (1, 2, 2.5, 5, 10):
+        if value <= factor * exponent:
+            return factor * exponent
+    return 10 * exponent
+
+
+def nice_range(low, high):
+    """Widen ``low .. high`` to round numbers, so similar datasets share limits."""
+    if not (math.isfinite(low) and math.isfinite(high)):
+        return 0.0, 1.0
+    step = nice_ceiling((high - low) / 10 or abs(high) / 10 or 1)
+    return math.floor(low / step) * step, math.ceil(high / step) * step + (step if high == low else 0)
+
+
+def _json_values(values):
+    return [float(v) if math.isfinite(v) else None for v in values]
+
+
+def compute_chart_data(record_id, bins=HISTOGRAM_BINS, sample_size=SAMPLE_SIZE):
+    """Chart-ready summary of a whole stored dataset, in two passes over the chunks.
+
+    The first pass finds the value range of each numeric column, the second
+    bins every row into histograms with fixed (nice) edges and keeps a uniform
+    random sample of ``sample_size`` rows for scatter plots: each row gets a
+    random key and the rows with the smallest keys are kept, which is a
+    uniform sample without replacement however the rows are chunked.
+    """
+    import numpy as np
+
+    lows = {col: math.inf for col in NUMERIC_COLUMNS}
+    highs = {col: -math.inf for col in NUMERIC_COLUMNS}
+    types = {}
+    total_rows = 0
+    for df in iter_chunks(record_id):
+        total_rows += len(df)
+        for col in NUMERIC_COLUMNS:
+            values = df[col].to_numpy(dtype=float)
+            values = values[np.isfinite(values)]
+            if len(values):
+                lows[col] = min(lows[col], float(values.min()))
+                highs[col] = max(highs[col], float(values.max()))
+        for etype, count in df["Type"].value_counts().items():
+            types[etype] = types.get(etype, 0) + int(count)
+
+    ranges = {col: nice_range(lows[col], highs[col]) for col in NUMERIC_COLUMNS}
+    counts = {col: np.zeros(bins, dtype=np.int64) for col in NUMERIC_COLUMNS}
+    rng = np.random.default_rng(0)
+    sample_keys = np.empty(0)
+    sample = np.empty((0, len(NUMERIC_COLUMNS)))
+    for df in iter_chunks(record_id):
+        values = df[NUMERIC_COLUMNS].to_numpy(dtype=float)
+        for i, col in enumerate(NUMERIC_COLUMNS):
+            column = values[:, i]
+            counts[col] += np.histogram(column[np.isfinite(column)], bins=bins, range=ranges[col])[0]
+
+        sample_keys = np.concatenate([sample_keys, rng.random(len(values))])
+        sample = np.concatenate([sample, values])
+        if len(sample_keys) > sample_size:
+            keep = np.argpartition(sample_keys, sample_size)[:sample_size]
+            sample_keys, sample = sample_keys[keep], sample[keep]
+
+    return {
+        "id": record_id,
+        "total_rows": total_rows,
+        "equipment_type_distribution": dict(
+            sorted(types.items(), key=lambda item: item[1], reverse=True)
+        ),
+        "histograms": {
+            col: {
+                "counts": counts[col].tolist(),
+                "edges": np.linspace(*ranges[col], bins + 1).tolist(),
+            }
+            for col in NUMERIC_COLUMNS
+        },
+        "sample": {col: _json_values(sample[:, i]) for i, col in enumerate(NUMERIC_COLUMNS)},
+    }
+
+
+def chart_data(record_id):
+    """``compute_chart_data`` cached next to the chunks (datasets never change)."""
+    path = chart_data_path(record_id)
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+
+    data = compute_chart_data(record_id)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+    return data
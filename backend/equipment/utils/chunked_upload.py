@@ -0,0 +1,216 @@
+import csv
+import hashlib
+import io
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+from .dataset_store import (
+    NUMERIC_COLUMNS,
+    REQUIRED_COLUMNS,
+    clean_frame,
+    dataset_dir,
+    text_dtypes,
+    write_chunk,
+)
+
+BLOCK_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+    """A chunk was rejected; the session stays at its previous offset."""
+
+
+class ParseError(Exception):
+    """The uploaded CSV cannot be parsed; the session is failed."""
+
+
+# ----------------------------------------------------------------------
+# Running statistics (JSON-serialisable so they live on the session row)
+# ----------------------------------------------------------------------
+def empty_stats():
+    return {
+        "rows": 0,
+        "sums": {col: 0.0 for col in NUMERIC_COLUMNS},
+        "counts": {col: 0 for col in NUMERIC_COLUMNS},
+        "types": {},
+    }
+
+
+def update_stats(stats, df):
+    stats["rows"] += len(df)
+    for col in NUMERIC_COLUMNS:
+        values = df[col].dropna()
+        stats["sums"][col] += float(values.sum())
+        stats["counts"][col] += int(len(values))
+    for etype, count in df["Type"].value_counts().items():
+        stats["types"][etype] = stats["types"].get(etype, 0) + int(count)
+    return stats
+
+
+def summarize(stats):
+    """Same summary keys as the one-shot ``upload_csv`` response."""
+
+    def average(col):
+        count = stats["counts"][col]
+        return round(stats["sums"][col] / count, 2) if count else None
+
+    return {
+        "total_equipment": stats["rows"],
+        "average_flowrate": average("Flowrate"),
+        "average_pressure": average("Pressure"),
+        "average_temperature": average("Temperature"),
+        "equipment_type_distribution": dict(
+            sorted(stats["types"].items(), key=lambda item: item[1], reverse=True)
+        ),
+    }
+
+
+# ----------------------------------------------------------------------
+# Session files
+# ----------------------------------------------------------------------
+def session_dir(session_id):
+    return Path(settings.CHUNKED_UPLOAD_ROOT) / str(session_id)
+
+
+def data_path(session_id):
+    return session_dir(session_id) / "data.csv"
+
+
+def chunks_dir(session_id):
+    return session_dir(session_id) / "chunks"
+
+
+def create_session_files(session_id):
+    chunks_dir(session_id).mkdir(parents=True, exist_ok=True)
+    data_path(session_id).touch()
+
+
+def delete_session_files(session_id):
+    shutil.rmtree(session_dir(session_id), ignore_errors=True)
+
+
+def parse_checksum(header):
+    """``sha256=<hex>`` -> ``<hex>``; only SHA-256 is accepted."""
+    algorithm, _, digest = (header or "").partition("=")
+    if algorithm.strip().lower() != "sha256" or not digest.strip():
+        raise ChunkError("X-Chunk-Checksum must be 'sha256=<hex digest>'")
+    return digest.strip().lower()
+
+
+def receive_chunk(session_id, stream, length, checksum):
+    """Spool ``length`` bytes from ``stream`` into a temporary file and verify them.
+
+    This is the slow part of a PUT (the body comes off the network), so it
+    runs before the session row is locked. Returns the spool path; a short
+    body or a checksum mismatch removes it and raises ``ChunkError``.
+    """
+    expected = parse_checksum(checksum)
+    path = session_dir(session_id) / f"incoming-{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(path, "wb") as f:
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                f.write(block)
+                digest.update(block)
+                written += len(block)
+
+        if written != length:
+            raise ChunkError(f"Expected {length} bytes, received {written}")
+        if digest.hexdigest() != expected:
+            raise ChunkError("Checksum mismatch")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def append_chunk(session, spool_path):
+    """Write a received chunk at the session's current offset (row must be locked)."""
+    offset = session.received_bytes
+    with open(spool_path, "rb") as src, open(data_path(session.id), "r+b") as f:
+        f.seek(offset)
+        shutil.copyfileobj(src, f, BLOCK_SIZE)
+        f.truncate(f.tell())
+        session.received_bytes = f.tell()
+    return session.received_bytes - offset
+
+
+# ----------------------------------------------------------------------
+# Incremental parsing
+# ----------------------------------------------------------------------
+def header_columns(header):
+    return next(csv.reader([header]))
+
+
+def parse_available(session, final=False):
+    """Parse every complete line received since the last call.
+
+    Each call turns the newly completed lines into one dataset chunk and folds
+    them into ``session.stats``, so by the time the last chunk arrives only its
+    own lines are left for ``finalize``. Records are split on newlines, so
+    quoted fields containing line breaks are not supported.
+    """
+    import pandas as pd
+
+    end = session.received_bytes
+    if end <= session.parsed_bytes:
+        return
+
+    with open(data_path(session.id), "rb") as f:
+        f.seek(session.parsed_bytes)
+        segment = f.read(end - session.parsed_bytes)
+
+    if not final:
+        last_newline = segment.rfind(b"\n")
+        if last_newline == -1:
+            return
+        segment = segment[:last_newline + 1]
+    consumed = len(segment)
+
+    if not session.header:
+        line, newline, segment = segment.partition(b"\n")
+        if not newline and not final:
+            return
+        try:
+            header = line.rstrip(b"\r").decode("utf-8-sig")
+            columns = [c.strip() for c in header_columns(header)]
+        except (UnicodeDecodeError, csv.Error, StopIteration) as e:
+            raise ParseError(f"Invalid header: {e}")
+        session.header = header
+        for col in REQUIRED_COLUMNS:
+            if col not in columns:
+                raise ParseError(f"Missing column: {col}")
+        session.stats = empty_stats()
+
+    if segment.strip():
+        try:
+            # dtypes come from the header, not from this segment's values
+            df = pd.read_csv(
+                io.BytesIO(session.header.encode("utf-8") + b"\n" + segment),
+                dtype=text_dtypes(header_columns(session.header)),
+            )
+        except (ValueError, pd.errors.ParserError) as e:
+            raise ParseError(str(e))
+        df = clean_frame(df)
+        update_stats(session.stats, df)
+        write_chunk(chunks_dir(session.id), session.chunks_written, df)
+        session.chunks_written += 1
+
+    session.parsed_bytes += consumed
+
+
+def promote_chunks(session, record_id):
+    """Move the parsed chunks into the dataset store of ``record_id``."""
+    target = dataset_dir(record_id)
+    shutil.rmtree(target, ignore_errors=True)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(chunks_dir(session.id), target)
+
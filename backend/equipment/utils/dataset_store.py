@@ -0,0 +1,110 @@
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+TEXT_COLUMNS = ['Equipment Name', 'Type']
+
+
+def dataset_dir(record_id):
+    """Directory holding the stored chunks of one UploadHistory record."""
+    return Path(settings.DATASET_STORE_ROOT) / str(record_id)
+
+
+def clean_frame(df):
+    """Return a typed copy of an uploaded frame.
+
+    Column names are stripped, the numeric columns are coerced to floats
+    (unparseable values become NaN) and every other column becomes a pandas
+    string, so chunks parsed separately always share one schema.
+    """
+    import pandas as pd
+
+    df = df.rename(columns=lambda c: str(c).strip())
+    df = df.copy()
+    for col in df.columns:
+        if col in NUMERIC_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        else:
+            df[col] = df[col].astype('string')
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].str.strip()
+    return df
+
+
+def text_dtypes(columns):
+    """``read_csv`` dtype map reading every non-numeric column as text.
+
+    Without it pandas infers each extra column per chunk (``007`` -> 7), and
+    the inferred values would differ from the raw text of the upload.
+    """
+    return {col: 'string' for col in columns if str(col).strip() not in NUMERIC_COLUMNS}
+
+
+def write_dataset(record_id, df):
+    """Store a cleaned frame as fixed-size columnar chunks on disk."""
+    directory = dataset_dir(record_id)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    df = clean_frame(df)
+    rows = settings.DATASET_CHUNK_ROWS
+    for index, start in enumerate(range(0, len(df), rows)):
+        write_chunk(directory, index, df.iloc[start:start + rows])
+
+
+def write_chunk(directory, index, df):
+    """Write one chunk as a Parquet file (columnar, typed, no code on load)."""
+    df.reset_index(drop=True).to_parquet(Path(directory) / f"chunk_{index:05d}.parquet", index=False)
+
+
+def chunk_paths(record_id):
+    return sorted(dataset_dir(record_id).glob('chunk_*.parquet'))
+
+
+def has_dataset(record_id):
+    return bool(chunk_paths(record_id))
+
+
+def iter_chunks(record_id):
+    """Yield the stored chunks of a record one DataFrame at a time."""
+    import pandas as pd
+
+    for path in chunk_paths(record_id):
+        yield pd.read_parquet(path)
+
+
+def read_rows(record_id, offset, limit):
+    """Rows ``offset .. offset + limit`` of a stored dataset as JSON-safe records.
+
+    Chunk sizes come from the Parquet footers, so only the chunks overlapping
+    the requested window are read.
+    """
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    rows = []
+    position = 0
+    for path in chunk_paths(record_id):
+        if len(rows) >= limit:
+            break
+        num_rows = pq.ParquetFile(path).metadata.num_rows
+        if position + num_rows <= offset:
+            position += num_rows
+            continue
+        start = max(offset - position, 0)
+        rows.extend(json_records(pd.read_parquet(path).iloc[start:start + limit - len(rows)]))
+        position += num_rows
+    return rows
+
+
+def json_records(df):
+    """Rows of a frame as dicts with missing values as None (NaN is not JSON)."""
+    df = df.astype(object)
+    return df.where(df.notna(), None).to_dict(orient='records')
+
+
+def delete_dataset(record_id):
+    shutil.rmtree(dataset_dir(record_id), ignore_errors=True)
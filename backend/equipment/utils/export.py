@@ -0,0 +1,338 @@
+import asyncio
+import io
+import logging
+import os
+import re
+import threading
+import uuid
+import zlib
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .dataset_store import NUMERIC_COLUMNS, dataset_dir, has_dataset, iter_chunks
+
+logger = logging.getLogger(__name__)
+
+# fmt -> (content type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'csv.gz': ('application/gzip', '.csv.gz'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+EXPORT_PARTS = ('dataset', 'aggregates')
+
+BLOCK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+# ----------------------------------------------------------------------
+# Frames
+# ----------------------------------------------------------------------
+def aggregate_by_type(frames):
+    """Per-type count and averages, accumulated one chunk at a time."""
+    import pandas as pd
+
+    counts = None
+    sums = None
+    for df in frames:
+        grouped = df.groupby('Type', dropna=False)[NUMERIC_COLUMNS]
+        chunk_counts = grouped.count()
+        chunk_sums = grouped.sum()
+        chunk_counts['rows'] = df.groupby('Type', dropna=False).size()
+        if counts is None:
+            counts, sums = chunk_counts, chunk_sums
+        else:
+            counts = counts.add(chunk_counts, fill_value=0)
+            sums = sums.add(chunk_sums, fill_value=0)
+
+    if counts is None:
+        return pd.DataFrame(columns=['Type', 'count'] + [f'avg_{c.lower()}' for c in NUMERIC_COLUMNS])
+
+    result = pd.DataFrame({'count': counts['rows'].astype('int64')})
+    for col in NUMERIC_COLUMNS:
+        result[f'avg_{col.lower()}'] = (sums[col] / counts[col]).round(2)
+    return result.reset_index()
+
+
+def iter_frames(record_id, part):
+    if part == 'aggregates':
+        yield aggregate_by_type(iter_chunks(record_id))
+    else:
+        yield from iter_chunks(record_id)
+
+
+# ----------------------------------------------------------------------
+# Encoders: iterables of frames -> iterables of bytes
+# ----------------------------------------------------------------------
+def iter_csv(frames):
+    for index, df in enumerate(frames):
+        yield df.to_csv(index=False, header=(index == 0)).encode('utf-8')
+
+
+def iter_gzip(chunks):
+    # wbits=31 writes a gzip container with a zero mtime, so the output is
+    # byte-for-byte reproducible and can be resumed with Range requests.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ByteSink(io.RawIOBase):
+    """Write-only file that hands its bytes back in pieces but keeps a true tell()."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_parquet(frames):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ByteSink()
+    writer = None
+    for df in frames:
+        if writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            writer = pq.ParquetWriter(sink, table.schema)
+        else:
+            table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+        writer.write_table(table)
+        data = sink.drain()
+        if data:
+            yield data
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_export(record_id, fmt, part):
+    frames = iter_frames(record_id, part)
+    if fmt == 'parquet':
+        return iter_parquet(frames)
+    if fmt == 'csv.gz':
+        return iter_gzip(iter_csv(frames))
+    return iter_csv(frames)
+
+
+# ----------------------------------------------------------------------
+# Export cache (lets interrupted downloads resume with Range)
+# ----------------------------------------------------------------------
+def export_path(record_id, fmt, part):
+    return dataset_dir(record_id) / 'exports' / f"{part}{EXPORT_FORMATS[fmt][1]}"
+
+
+def tee_to_file(chunks, path):
+    """Yield ``chunks`` while writing them to ``path``.
+
+    The file only appears once the whole stream was written, so a client that
+    disconnects half way never leaves a truncated export behind.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    completed = False
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp_path, path)
+        completed = True
+    finally:
+        if not completed and tmp_path.exists():
+            tmp_path.unlink()
+
+
+# export path -> [lock, number of callers using it]
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+
+def build_export(record_id, fmt, part):
+    """Write the export file to the cache if it is not there yet.
+
+    Callers in the same process that ask for an export while it is being
+    built wait for that build instead of starting a second one.
+    """
+    path = export_path(record_id, fmt, part)
+    with _build_locks_guard:
+        entry = _build_locks.setdefault(path, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            if not path.exists():
+                for _ in tee_to_file(iter_export(record_id, fmt, part), path):
+                    pass
+    finally:
+        with _build_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _build_locks[path]
+    return path
+
+
+def _build_all_exports(record_id):
+    for part in EXPORT_PARTS:
+        for fmt in EXPORT_FORMATS:
+            # the record may have been evicted by retention in the meantime
+            if not has_dataset(record_id):
+                return
+            try:
+                build_export(record_id, fmt, part)
+            except Exception:
+                logger.exception("Building the %s %s export of record %s failed", part, fmt, record_id)
+
+
+def prebuild_exports(record_id):
+    """Build every export of a new upload in a background thread.
+
+    A ``Range`` request needs the finished file (its total size goes into
+    ``Content-Range``), so without this the first resume of an interrupted
+    download would have to build the whole export before its first byte.
+    Returns the thread, or ``None`` when ``EXPORT_PREBUILD`` is off.
+    """
+    if not settings.EXPORT_PREBUILD:
+        return None
+    thread = threading.Thread(
+        target=_build_all_exports, args=(record_id,), name=f"export-prebuild-{record_id}", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def export_param_error(fmt, part):
+    """Return ``(message, status)`` for invalid export parameters, else ``None``."""
+    if fmt not in EXPORT_FORMATS:
+        return f"Unsupported fmt: {fmt}", 400
+    if part not in EXPORT_PARTS:
+        return f"Unsupported part: {part}", 400
+    return None
+
+
+def export_filename(record, fmt, part):
+    return f"{record.filename.rsplit('.', 1)[0]}.{part}{EXPORT_FORMATS[fmt][1]}"
+
+
+def export_etag(record, fmt, part):
+    return f'"{record.id}-{int(record.uploaded_at.timestamp())}-{part}-{fmt}"'
+
+
+def file_response(path, content_type, range_header, if_range, etag, reader=None):
+    """Stream a cached export file, honouring ``Range`` and ``If-Range``.
+
+    ``reader`` produces the body from ``(path, start, end)``; the async views
+    pass ``aiter_file_range`` so the response is streamed without blocking.
+    """
+    reader = reader or iter_file_range
+    size = path.stat().st_size
+    if range_header and if_range and if_range != etag:
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(reader(path, start, end), status=206, content_type=content_type)
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+    else:
+        start, end = 0, size - 1
+        response = StreamingHttpResponse(reader(path, start, end), content_type=content_type)
+    response['Content-Length'] = str(end - start + 1)
+    return response
+
+
+def parse_range(header, size):
+    """Parse a single-range ``Range`` header.
+
+    Returns ``(start, end)`` (inclusive), ``None`` when the header should be
+    ignored, or raises ``ValueError`` when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = f.read(min(BLOCK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+async def aiter_sync(iterator):
+    """Drive a blocking iterator from async code, one item per worker-thread hop.
+
+    The iterator is closed on exit, so a generator such as ``tee_to_file``
+    still cleans up when the client disconnects mid-stream.
+    """
+    done = object()
+    try:
+        while True:
+            item = await asyncio.to_thread(next, iterator, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await asyncio.to_thread(close)
+
+
+async def aiter_file_range(path, start, end):
+    """Async variant of ``iter_file_range``; file reads run in a worker thread."""
+    f = await asyncio.to_thread(open, path, 'rb')
+    try:
+        await asyncio.to_thread(f.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = await asyncio.to_thread(f.read, min(BLOCK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        f.close()
@@ -25,3 +25,19 @@ def generate_pdf(history):
     c.save()
     buffer.seek(0)
     return buffer
+
+
+def record_pdf(record):
+    """Single-page summary served by the download-pdf endpoints."""
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer)
+    p.drawString(100, 800, f"Filename: {record.filename}")
+    p.drawString(100, 780, f"Total Equipment: {record.total_equipment}")
+    p.drawString(100, 760, f"Average Flowrate: {record.avg_flowrate}")
+    p.drawString(100, 740, f"Average Pressure: {record.avg_pressure}")
+    p.drawString(100, 720, f"Average Temperature: {record.avg_temperature}")
+    p.showPage()
+    p.save()
+
+    buffer.seek(0)
+    return buffer
@@ -1,12 +1,46 @@
-from .models import UploadHistory
-import pandas as pd
+from datetime import timedelta
+
+from .models import UploadHistory, UploadSession
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from django.http import FileResponse
-from .utils.pdf_report import generate_pdf
-import io
-from reportlab.pdfgen import canvas
-from django.http import HttpResponse, FileResponse
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from .utils.chunked_upload import (
+    ChunkError,
+    ParseError,
+    append_chunk,
+    create_session_files,
+    delete_session_files,
+    parse_available,
+    promote_chunks,
+    receive_chunk,
+    summarize,
+)
+from .utils.chart_data import chart_data
+from .utils.dataset_store import (
+    NUMERIC_COLUMNS,
+    REQUIRED_COLUMNS,
+    clean_frame,
+    delete_dataset,
+    has_dataset,
+    json_records,
+    read_rows,
+    write_dataset,
+)
+from .utils.export import (
+    EXPORT_FORMATS,
+    build_export,
+    export_etag,
+    export_filename,
+    export_param_error,
+    export_path,
+    file_response,
+    iter_export,
+    prebuild_exports,
+    tee_to_file,
+)
 
 
 @api_view(['POST'])
@@ -15,35 +49,45 @@ def upload_csv(request):
     if not file:
         return Response({"error": "No file uploaded"}, status=400)
 
-    df = pd.read_csv(file)
+    # pandas is imported on first use so worker boot stays fast
+    import pandas as pd
+
+    # same typing as the chunked path: stripped names, numeric columns as
+    # floats (unparseable values become NaN), everything else as the raw text
+    df = clean_frame(pd.read_csv(file, dtype=str))
 
-    required_cols = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-    for col in required_cols:
+    for col in REQUIRED_COLUMNS:
         if col not in df.columns:
             return Response({"error": f"Missing column: {col}"}, status=400)
+    for col in NUMERIC_COLUMNS:
+        if df[col].isna().all():
+            return Response({"error": f"No valid values in column: {col}"}, status=400)
 
     total_equipment = len(df)
-    avg_flowrate = round(df['Flowrate'].mean(), 2)
-    avg_pressure = round(df['Pressure'].mean(), 2)
-    avg_temperature = round(df['Temperature'].mean(), 2)
+    avg_flowrate = round(float(df['Flowrate'].mean()), 2)
+    avg_pressure = round(float(df['Pressure'].mean()), 2)
+    avg_temperature = round(float(df['Temperature'].mean()), 2)
 
-    equipment_type_distribution = df['Type'].value_counts().to_dict()
-    table_data = df.to_dict(orient='records')
+    equipment_type_distribution = {
+        str(etype): int(count) for etype, count in df['Type'].value_counts().items()
+    }
+    table_data = json_records(df)
 
+    owner = request_owner(request)
     history = UploadHistory.objects.create(
+        owner=owner,
         filename=file.name,
         total_equipment=total_equipment,
         avg_flowrate=avg_flowrate,
         avg_pressure=avg_pressure,
         avg_temperature=avg_temperature
     )
-
-    # keep only last 5 uploads
-    old = UploadHistory.objects.order_by('-uploaded_at')[5:]
-    for o in old:
-        o.delete()
+    write_dataset(history.id, df)
+    transaction.on_commit(lambda: prebuild_exports(history.id))
+    _apply_retention(owner)
 
     return Response({
+        "id": history.id,
         "total_equipment": total_equipment,
         "average_flowrate": avg_flowrate,
         "average_pressure": avg_pressure,
@@ -53,18 +97,266 @@ def upload_csv(request):
     })
 
 
+def request_owner(request):
+    """Owner for the request's uploads: the user, or None for anonymous access."""
+    user = request.user
+    return user if user.is_authenticated else None
+
+
+def owned_uploads(owner):
+    """Uploads visible to ``owner``; every read path is scoped through this."""
+    return UploadHistory.objects.filter(owner=owner)
+
+
+def _apply_retention(owner):
+    # keep only the owner's last N uploads (served by the (owner, uploaded_at) index)
+    old_ids = list(
+        owned_uploads(owner)
+        .order_by('-uploaded_at')
+        .values_list('id', flat=True)[settings.UPLOAD_HISTORY_RETENTION:]
+    )
+    for record_id in old_ids:
+        delete_dataset(record_id)
+    UploadHistory.objects.filter(id__in=old_ids).delete()
+
+
+# ----------------------------------------------------------------------
+# Resumable chunked upload
+#
+#   POST /api/upload/chunked/                      {filename, total_size}
+#   PUT  /api/upload/chunked/<id>/?offset=N        raw bytes + X-Chunk-Checksum
+#   GET  /api/upload/chunked/<id>/                 current offset (to resume)
+#   POST /api/upload/chunked/<id>/finalize/
+# ----------------------------------------------------------------------
+def _session_status(session):
+    return {
+        "upload_id": str(session.id),
+        "filename": session.filename,
+        "offset": session.received_bytes,
+        "total_size": session.total_size,
+        "parsed_bytes": session.parsed_bytes,
+        "status": session.status,
+    }
+
+
+def _cleanup_stale_sessions():
+    cutoff = timezone.now() - timedelta(hours=settings.CHUNKED_UPLOAD_MAX_AGE_HOURS)
+    for session in UploadSession.objects.filter(updated_at__lt=cutoff):
+        delete_session_files(session.id)
+        session.delete()
+
+
+def _fail_session(session, message):
+    session.status = UploadSession.STATUS_FAILED
+    session.error = message
+    session.save()
+    delete_session_files(session.id)
+    return Response({"error": message, **_session_status(session)}, status=400)
+
+
+@api_view(['POST'])
+def chunked_upload_init(request):
+    filename = request.data.get("filename")
+    try:
+        total_size = int(request.data.get("total_size"))
+    except (TypeError, ValueError):
+        return Response({"error": "total_size must be an integer"}, status=400)
+    if not filename:
+        return Response({"error": "Missing filename"}, status=400)
+    if total_size <= 0:
+        return Response({"error": "total_size must be positive"}, status=400)
+
+    _cleanup_stale_sessions()
+    session = UploadSession.objects.create(
+        owner=request_owner(request), filename=filename, total_size=total_size
+    )
+    create_session_files(session.id)
+
+    data = _session_status(session)
+    data["chunk_size"] = settings.CHUNKED_UPLOAD_CHUNK_SIZE
+    return Response(data, status=201)
+
+
+@api_view(['GET', 'PUT'])
+def chunked_upload_chunk(request, upload_id):
+    if request.method == 'GET':
+        try:
+            session = UploadSession.objects.get(id=upload_id, owner=request_owner(request))
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=404)
+        return Response(_session_status(session))
+
+    try:
+        offset = int(request.GET.get("offset"))
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except (TypeError, ValueError):
+        return Response({"error": "offset and Content-Length must be integers"}, status=400)
+
+    # Cheap checks first, then take the body off the network into a spool file
+    # without holding the row lock or an open transaction.
+    try:
+        session = UploadSession.objects.get(id=upload_id, owner=request_owner(request))
+    except UploadSession.DoesNotExist:
+        return Response({"error": "Upload not found"}, status=404)
+    error = _chunk_error(session, offset, length)
+    if error:
+        return error
+    try:
+        spool_path = receive_chunk(session.id, request.stream, length, request.META.get("HTTP_X_CHUNK_CHECKSUM"))
+    except ChunkError as e:
+        return Response({"error": str(e), **_session_status(session)}, status=400)
+
+    try:
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(id=session.id)
+            # another request (e.g. a retry of this chunk) may have won the race
+            error = _chunk_error(session, offset, length)
+            if error:
+                return error
+
+            append_chunk(session, spool_path)
+            try:
+                parse_available(session)
+            except ParseError as e:
+                return _fail_session(session, str(e))
+
+            session.save()
+    finally:
+        spool_path.unlink(missing_ok=True)
+    return Response(_session_status(session))
+
+
+def _chunk_error(session, offset, length):
+    if session.status != UploadSession.STATUS_ACTIVE:
+        return Response({"error": f"Upload is {session.status}", **_session_status(session)}, status=409)
+    if offset != session.received_bytes:
+        # client and server disagree (e.g. a retried chunk): tell it where to resume
+        return Response({"error": "Offset mismatch", **_session_status(session)}, status=409)
+    if length <= 0 or offset + length > session.total_size:
+        return Response({"error": "Chunk is empty or exceeds total_size", **_session_status(session)}, status=400)
+    return None
+
+
+@api_view(['POST'])
+def chunked_upload_finalize(request, upload_id):
+    with transaction.atomic():
+        try:
+            session = UploadSession.objects.select_for_update().get(
+                id=upload_id, owner=request_owner(request)
+            )
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=404)
+
+        if session.status == UploadSession.STATUS_FAILED:
+            return Response({"error": session.error, **_session_status(session)}, status=400)
+        if session.status == UploadSession.STATUS_ACTIVE:
+            if session.received_bytes != session.total_size:
+                return Response({"error": "Upload is incomplete", **_session_status(session)}, status=409)
+
+            try:
+                parse_available(session, final=True)
+            except ParseError as e:
+                return _fail_session(session, str(e))
+            if not session.header:
+                return _fail_session(session, "Empty file")
+
+            summary = summarize(session.stats)
+            # same rule as upload_csv: every average must exist to be stored
+            for col in NUMERIC_COLUMNS:
+                if summary[f"average_{col.lower()}"] is None:
+                    return _fail_session(session, f"No valid values in column: {col}")
+            history = UploadHistory.objects.create(
+                owner=session.owner,
+                filename=session.filename,
+                total_equipment=summary["total_equipment"],
+                avg_flowrate=summary["average_flowrate"],
+                avg_pressure=summary["average_pressure"],
+                avg_temperature=summary["average_temperature"],
+            )
+            promote_chunks(session, history.id)
+            delete_session_files(session.id)
+            transaction.on_commit(lambda: prebuild_exports(history.id))
+
+            session.history = history
+            session.status = UploadSession.STATUS_COMPLETE
+            session.save()
+            _apply_retention(session.owner)
+
+    # Finalizing twice (e.g. the first response was lost) returns the same summary
+    response = summarize(session.stats)
+    response["id"] = session.history_id
+    response["table_data"] = read_rows(session.history_id, 0, settings.TABLE_PREVIEW_ROWS) if session.history_id else []
+    response["table_data_truncated"] = response["total_equipment"] > len(response["table_data"])
+    return Response(response)
+
+
 @api_view(['GET'])
 def upload_history(request):
-    history = UploadHistory.objects.order_by('-uploaded_at')[:5]
-    return Response([
-        {
-            "id": h.id,
-            "filename": h.filename,
-            "total_equipment": h.total_equipment,
-            "uploaded_at": h.uploaded_at.strftime("%Y-%m-%d %H:%M")
-        }
-        for h in history
-    ])
+    history = owned_uploads(request_owner(request)).order_by('-uploaded_at')[:settings.UPLOAD_HISTORY_RETENTION]
+    return Response([history_entry(h) for h in history])
+
+
+def history_entry(h):
+    return {
+        "id": h.id,
+        "filename": h.filename,
+        "total_equipment": h.total_equipment,
+        "uploaded_at": h.uploaded_at.strftime("%Y-%m-%d %H:%M")
+    }
+
+
+def page_params(request):
+    """``page`` (1-based) and ``page_size`` query parameters, clamped."""
+    page = max(int(request.GET.get("page", 1)), 1)
+    page_size = int(request.GET.get("page_size", settings.ROWS_PAGE_SIZE))
+    page_size = min(max(page_size, 1), settings.ROWS_MAX_PAGE_SIZE)
+    return page, page_size
+
+
+def rows_page(record, page, page_size):
+    return {
+        "id": record.id,
+        "page": page,
+        "page_size": page_size,
+        "total_rows": record.total_equipment,
+        "rows": read_rows(record.id, (page - 1) * page_size, page_size),
+    }
+
+
+@api_view(['GET'])
+def dataset_rows(request):
+    """One page of the stored, cleaned rows of an upload."""
+    record_id = request.GET.get("id")
+    if not record_id:
+        return Response({"error": "Missing ID"}, status=400)
+    try:
+        page, page_size = page_params(request)
+    except ValueError:
+        return Response({"error": "page and page_size must be integers"}, status=400)
+
+    try:
+        record = owned_uploads(request_owner(request)).get(id=record_id)
+    except (UploadHistory.DoesNotExist, ValueError):
+        return Response({"error": "Record not found"}, status=404)
+
+    return Response(rows_page(record, page, page_size))
+
+
+@api_view(['GET'])
+def dataset_chart_data(request):
+    """Histograms over all rows plus a uniform row sample, for the desktop charts."""
+    record_id = request.GET.get("id")
+    if not record_id:
+        return Response({"error": "Missing ID"}, status=400)
+
+    try:
+        record = owned_uploads(request_owner(request)).get(id=record_id)
+    except (UploadHistory.DoesNotExist, ValueError):
+        return Response({"error": "Record not found"}, status=404)
+    if not has_dataset(record.id):
+        return Response({"error": "No stored dataset for this record"}, status=404)
+
+    return Response(chart_data(record.id))
 
 
 @api_view(['GET'])
@@ -78,22 +370,66 @@ def download_pdf(request):
         return HttpResponse("Missing ID", status=400)
 
     try:
-        record = UploadHistory.objects.get(id=record_id)
-    except UploadHistory.DoesNotExist:
+        record = owned_uploads(request_owner(request)).get(id=record_id)
+    except (UploadHistory.DoesNotExist, ValueError):
         return HttpResponse("Record not found", status=404)
 
-    # Generate PDF
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer)
-    p.drawString(100, 800, f"Filename: {record.filename}")
-    p.drawString(100, 780, f"Total Equipment: {record.total_equipment}")
-    p.drawString(100, 760, f"Average Flowrate: {record.avg_flowrate}")
-    p.drawString(100, 740, f"Average Pressure: {record.avg_pressure}")
-    p.drawString(100, 720, f"Average Temperature: {record.avg_temperature}")
-    p.showPage()
-    p.save()
-
-    buffer.seek(0)
+    # Generate PDF (reportlab is only loaded when a report is requested)
+    from .utils.pdf_report import record_pdf
+
+    buffer = record_pdf(record)
     response = HttpResponse(buffer, content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="{record.filename}.pdf"'
     return response
+
+
+@api_view(['GET'])
+def export_dataset(request):
+    """Stream the stored dataset (or its per-type aggregates) of one upload.
+
+    Query parameters: ``id``, ``fmt`` (csv, csv.gz, parquet) and ``part``
+    (dataset, aggregates). ``fmt`` is used instead of ``format`` because DRF
+    reserves the latter for renderer selection.
+    """
+    record_id = request.GET.get("id")
+    fmt = request.GET.get("fmt", "csv")
+    part = request.GET.get("part", "dataset")
+    if not record_id:
+        return Response({"error": "Missing ID"}, status=400)
+    param_error = export_param_error(fmt, part)
+    if param_error:
+        return Response({"error": param_error[0]}, status=param_error[1])
+
+    try:
+        record = owned_uploads(request_owner(request)).get(id=record_id)
+    except (UploadHistory.DoesNotExist, ValueError):
+        return Response({"error": "Record not found"}, status=404)
+    if not has_dataset(record.id):
+        return Response({"error": "No stored dataset for this record"}, status=404)
+
+    content_type = EXPORT_FORMATS[fmt][0]
+    etag = export_etag(record, fmt, part)
+    range_header = request.META.get("HTTP_RANGE")
+
+    path = export_path(record.id, fmt, part)
+    if range_header:
+        # Resuming needs the finished file. It is normally prebuilt at upload
+        # time (prebuild_exports); otherwise build it now, or wait for the
+        # prebuild still running.
+        build_export(record.id, fmt, part)
+
+    if path.exists():
+        response = file_response(
+            path, content_type, range_header, request.META.get("HTTP_IF_RANGE"), etag
+        )
+    else:
+        # First download: stream straight from the chunks and keep a copy.
+        response = StreamingHttpResponse(
+            tee_to_file(iter_export(record.id, fmt, part), path),
+            content_type=content_type,
+        )
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Content-Disposition"] = f'attachment; filename="{export_filename(record, fmt, part)}"'
+    return response
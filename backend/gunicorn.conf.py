@@ -0,0 +1,30 @@
+# gunicorn.conf.py
+#
+#   gunicorn -c gunicorn.conf.py config.wsgi
+#
+# The Django views import pandas and reportlab lazily so a single process
+# (runserver, tests, manage.py commands) starts quickly. Under gunicorn we go
+# the other way: the master imports the app and the heavy libraries once
+# before forking, so every worker starts with them already loaded and shares
+# the pages copy-on-write instead of paying the import on its first request.
+import importlib
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+preload_app = True
+
+PRELOAD_MODULES = (
+    "pandas",
+    "reportlab.pdfgen.canvas",
+    "reportlab.lib.pagesizes",
+)
+
+
+def on_starting(server):
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            server.log.warning("Could not preload %s", name)
@@ -0,0 +1,446 @@
+# charts.py
+"""Chart subsystem for the desktop app.
+
+Charts are rendered off the GUI thread with matplotlib's Agg backend and the
+finished image is painted by a plain QWidget:
+
+- ``ChartRenderer`` lives in a QThread and owns one Agg figure. Every chart
+  type keeps its own axes and artists; switching dataset only updates artist
+  data in place (bar heights, scatter offsets). The static part of the figure
+  (axes, ticks, labels) is cached and restored with ``restore_region``, so a
+  full ``draw()`` only happens when limits or labels actually change.
+- Chart data comes from the backend's ``/api/chart-data/`` endpoint, fetched
+  in the renderer thread: histograms binned over every stored row and a
+  uniform sample of at most 5000 rows for the scatter plots, so large chunked
+  uploads are not charted from their first page of ``table_data``.
+- ``ChartPanel`` is the widget used by ``EquipmentApp``: a chart selector, the
+  image view and the last render time.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PyQt5.QtCore import QObject, QThread, QTimer, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QComboBox, QHBoxLayout, QLabel, QVBoxLayout, QWidget
+
+NUMERIC_COLUMNS = ["Flowrate", "Pressure", "Temperature"]
+
+MAX_BARS = 12
+HISTOGRAM_BINS = 30
+
+# (key, label) in the order shown in the chart selector
+CHART_KINDS = [
+    ("types", "Equipment Type Distribution"),
+    ("hist:Flowrate", "Histogram: Flowrate"),
+    ("hist:Pressure", "Histogram: Pressure"),
+    ("hist:Temperature", "Histogram: Temperature"),
+    ("scatter:Flowrate:Pressure", "Scatter: Flowrate vs Pressure"),
+    ("scatter:Flowrate:Temperature", "Scatter: Flowrate vs Temperature"),
+    ("scatter:Pressure:Temperature", "Scatter: Pressure vs Temperature"),
+]
+
+# fixed axes rectangle: no tight_layout() on every render
+AXES_RECT = [0.1, 0.22, 0.86, 0.68]
+
+
+# ----------------------------------------------------------------------
+# Data preparation
+# ----------------------------------------------------------------------
+def nice_ceiling(value):
+    """Smallest 1/2/2.5/5 x 10^n that is >= value.
+
+    Axis limits are snapped to these so that similar datasets share limits
+    and the cached background can be reused.
+    """
+    if value <= 0 or not math.isfinite(value):
+        return 1.0
+    exponent = 10 ** math.floor(math.log10(value))
+    for factor in (1, 2, 2.5, 5, 10):
+        if value <= factor * exponent:
+            return factor * exponent
+    return 10 * exponent
+
+
+def nice_range(low, high):
+    if not (math.isfinite(low) and math.isfinite(high)):
+        return 0.0, 1.0
+    step = nice_ceiling((high - low) / 10 or abs(high) / 10 or 1)
+    return math.floor(low / step) * step, math.ceil(high / step) * step + (step if high == low else 0)
+
+
+class Dataset:
+    """Chart-ready arrays built from one ``/api/chart-data/`` response."""
+
+    def __init__(self, data):
+        data = data or {}
+        dist = data.get("equipment_type_distribution") or {}
+        items = sorted(dist.items(), key=lambda item: item[1], reverse=True)
+        if len(items) > MAX_BARS:
+            other = sum(count for _, count in items[MAX_BARS - 1:])
+            items = items[:MAX_BARS - 1] + [("Other", other)]
+        self.types = [str(name) for name, _ in items]
+        self.type_counts = np.array([count for _, count in items], dtype=float)
+        self.row_count = data.get("total_rows", 0)
+
+        # already binned on the server; missing columns render as empty
+        histograms = data.get("histograms") or {}
+        self.histograms = {}
+        for col in NUMERIC_COLUMNS:
+            histogram = histograms.get(col)
+            if histogram:
+                counts = np.array(histogram["counts"], dtype=float)
+                edges = np.array(histogram["edges"], dtype=float)
+            else:
+                counts, edges = np.zeros(HISTOGRAM_BINS), np.linspace(0, 1, HISTOGRAM_BINS + 1)
+            self.histograms[col] = (counts, edges)
+
+        # None (missing value) becomes NaN in a float array
+        sample = data.get("sample") or {}
+        self.samples = {
+            col: np.array(sample.get(col) or [], dtype=float) for col in NUMERIC_COLUMNS
+        }
+
+    def scatter_points(self, x_col, y_col):
+        x, y = self.samples[x_col], self.samples[y_col]
+        mask = np.isfinite(x) & np.isfinite(y)
+        return np.column_stack([x[mask], y[mask]])
+
+
+# ----------------------------------------------------------------------
+# Charts: persistent axes + artists, updated in place
+# ----------------------------------------------------------------------
+class _Chart(ABC):
+    def __init__(self, figure):
+        self.ax = figure.add_axes(AXES_RECT)
+        self.ax.set_visible(False)
+        self.message = self.ax.text(
+            0.5, 0.5, "No chart data available",
+            ha="center", va="center", transform=self.ax.transAxes, visible=False,
+        )
+
+    @abstractmethod
+    def update(self, dataset):
+        """Push ``dataset`` into the artists; return the background key.
+
+        The key must cover everything drawn into the cached background,
+        including whether the "no data" message is shown.
+        """
+
+    @abstractmethod
+    def artists(self):
+        """Animated artists drawn over the cached background."""
+
+
+class TypeBarChart(_Chart):
+    def __init__(self, figure):
+        super().__init__(figure)
+        self.bars = self.ax.bar(range(MAX_BARS), np.zeros(MAX_BARS), color="skyblue", animated=True)
+        self.ax.set_xlabel("Equipment Type")
+        self.ax.set_ylabel("Count")
+        self.ax.set_title("Equipment Type Distribution")
+        self._labels = None
+
+    def update(self, dataset):
+        count = len(dataset.types)
+        for i, bar in enumerate(self.bars):
+            bar.set_visible(i < count)
+            bar.set_height(dataset.type_counts[i] if i < count else 0)
+
+        labels = tuple(dataset.types)
+        if labels != self._labels:
+            self.ax.set_xticks(range(count))
+            self.ax.set_xticklabels(labels, rotation=45, ha="right")
+            self._labels = labels
+        top = nice_ceiling(dataset.type_counts.max() * 1.05) if count else 1.0
+        self.ax.set_xlim(-0.6, max(count, 1) - 0.4)
+        self.ax.set_ylim(0, top)
+        self.message.set_visible(count == 0)
+        return ("types", labels, top, self.message.get_visible())
+
+    def artists(self):
+        return self.bars
+
+
+class HistogramChart(_Chart):
+    def __init__(self, figure, column):
+        super().__init__(figure)
+        self.column = column
+        self.bars = self._make_bars(HISTOGRAM_BINS)
+        self.ax.set_xlabel(column)
+        self.ax.set_ylabel("Count")
+        self.ax.set_title(f"{column} Distribution")
+
+    def _make_bars(self, count):
+        return self.ax.bar(
+            range(count), np.zeros(count), width=1.0, align="edge",
+            color="skyblue", edgecolor="#3949ab", animated=True,
+        )
+
+    def update(self, dataset):
+        counts, edges = dataset.histograms[self.column]
+        if len(self.bars) != len(counts):
+            # the bin count comes from the server; keep one bar per bin
+            self.bars.remove()
+            self.bars = self._make_bars(len(counts))
+        for bar, height, left, right in zip(self.bars, counts, edges[:-1], edges[1:]):
+            bar.set_x(left)
+            bar.set_width(right - left)
+            bar.set_height(height)
+        xlim = (float(edges[0]), float(edges[-1]))
+        top = nice_ceiling(counts.max() * 1.05) if counts.any() else 1.0
+        self.ax.set_xlim(*xlim)
+        self.ax.set_ylim(0, top)
+        self.message.set_visible(not counts.any())
+        return ("hist", self.column, xlim, top, self.message.get_visible())
+
+    def artists(self):
+        return self.bars
+
+
+class ScatterChart(_Chart):
+    def __init__(self, figure, x_col, y_col):
+        super().__init__(figure)
+        self.x_col, self.y_col = x_col, y_col
+        self.points = self.ax.scatter([], [], s=6, color="skyblue", alpha=0.6, animated=True)
+        self.ax.set_xlabel(x_col)
+        self.ax.set_ylabel(y_col)
+        self.ax.set_title(f"{x_col} vs {y_col}")
+
+    def update(self, dataset):
+        points = dataset.scatter_points(self.x_col, self.y_col)
+        self.points.set_offsets(points if len(points) else np.empty((0, 2)))
+        if len(points):
+            xlim = nice_range(points[:, 0].min(), points[:, 0].max())
+            ylim = nice_range(points[:, 1].min(), points[:, 1].max())
+        else:
+            xlim = ylim = (0.0, 1.0)
+        self.ax.set_xlim(*xlim)
+        self.ax.set_ylim(*ylim)
+        self.message.set_visible(not len(points))
+        return ("scatter", self.x_col, self.y_col, xlim, ylim, self.message.get_visible())
+
+    def artists(self):
+        return [self.points]
+
+
+def _make_chart(figure, kind):
+    name, _, rest = kind.partition(":")
+    if name == "hist":
+        return HistogramChart(figure, rest)
+    if name == "scatter":
+        return ScatterChart(figure, *rest.split(":"))
+    return TypeBarChart(figure)
+
+
+# ----------------------------------------------------------------------
+# Renderer (worker thread)
+# ----------------------------------------------------------------------
+class ChartRenderer(QObject):
+    """Renders charts into QImages; all matplotlib work happens in its thread."""
+
+    rendered = pyqtSignal(int, QImage, float)  # request id, image, render ms
+    loaded = pyqtSignal(float, str)  # fetch + Dataset construction ms, fetch error or ""
+
+    def __init__(self, fetch):
+        super().__init__()
+        # fetch(record_id) -> /api/chart-data/ response; called in this thread
+        self._fetch = fetch
+        # id of the newest request, set from the GUI thread; older queued
+        # requests are skipped instead of rendered
+        self.latest = 0
+        self._figure = None
+        self._canvas = None
+        self._charts = {}
+        self._current = None
+        self._dataset = Dataset({})
+        self._background = None
+        self._background_key = None
+
+    @pyqtSlot(object)
+    def load(self, data):
+        start = time.perf_counter()
+        data = data or {}
+        # without chart data (e.g. the backend is unreachable) only the type
+        # distribution from the upload response is charted
+        chart_data = {"equipment_type_distribution": data.get("equipment_type_distribution")}
+        error = ""
+        if data.get("id") is not None:
+            try:
+                chart_data = self._fetch(data["id"])
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        self._dataset = Dataset(chart_data)
+        self.loaded.emit((time.perf_counter() - start) * 1000, error)
+
+    @pyqtSlot(int, str, int, int, float)
+    def render(self, request_id, kind, width, height, dpi):
+        if request_id != self.latest or width <= 0 or height <= 0:
+            return
+        start = time.perf_counter()
+
+        self._resize(width, height, dpi)
+        chart = self._charts.get(kind)
+        if chart is None:
+            chart = self._charts[kind] = _make_chart(self._figure, kind)
+        if chart is not self._current:
+            if self._current is not None:
+                self._current.ax.set_visible(False)
+            chart.ax.set_visible(True)
+            self._current = chart
+            self._background = None
+
+        key = chart.update(self._dataset)
+        if self._background is None or key != self._background_key:
+            # animated artists are skipped by draw(), leaving a clean background
+            self._canvas.draw()
+            self._background = self._canvas.copy_from_bbox(self._figure.bbox)
+            self._background_key = key
+        else:
+            self._canvas.restore_region(self._background)
+        for artist in chart.artists():
+            if artist.get_visible():
+                chart.ax.draw_artist(artist)
+
+        width, height = self._canvas.get_width_height()
+        image = QImage(bytes(self._canvas.buffer_rgba()), width, height, QImage.Format_RGBA8888).copy()
+        self.rendered.emit(request_id, image, (time.perf_counter() - start) * 1000)
+
+    def _resize(self, width, height, dpi):
+        if self._figure is None:
+            self._figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+            self._canvas = FigureCanvasAgg(self._figure)
+            return
+        if self._canvas.get_width_height() != (width, height) or self._figure.dpi != dpi:
+            self._figure.set_dpi(dpi)
+            self._figure.set_size_inches(width / dpi, height / dpi)
+            self._background = None
+
+
+# ----------------------------------------------------------------------
+# GUI side
+# ----------------------------------------------------------------------
+class ChartView(QWidget):
+    """Paints the latest rendered chart image."""
+
+    resized = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._image = None
+        self.setMinimumHeight(300)
+
+    def set_image(self, image):
+        self._image = image
+        self.update()
+
+    def paintEvent(self, event):
+        if self._image is None:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.drawImage(self.rect(), self._image)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit()
+
+
+class ChartPanel(QWidget):
+    """Chart selector + off-thread rendered chart view."""
+
+    load_requested = pyqtSignal(object)
+    render_requested = pyqtSignal(int, str, int, int, float)
+
+    def __init__(self, fetch, parent=None):
+        super().__init__(parent)
+        self._request_id = 0
+        self._has_data = False
+        self._load_ms = None
+        self._load_error = ""
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        controls = QHBoxLayout()
+        self.kind_combo = QComboBox()
+        for key, label in CHART_KINDS:
+            self.kind_combo.addItem(label, key)
+        self.kind_combo.currentIndexChanged.connect(self.refresh)
+        controls.addWidget(self.kind_combo)
+        self.timing_label = QLabel("")
+        self.timing_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        controls.addWidget(self.timing_label)
+        layout.addLayout(controls)
+
+        self.view = ChartView()
+        layout.addWidget(self.view)
+
+        # re-render at most once per burst of resize events
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(30)
+        self._resize_timer.timeout.connect(self.refresh)
+        self.view.resized.connect(self._resize_timer.start)
+
+        self._thread = QThread(self)
+        self.renderer = ChartRenderer(fetch)
+        self.renderer.moveToThread(self._thread)
+        self.load_requested.connect(self.renderer.load)
+        self.render_requested.connect(self.renderer.render)
+        self.renderer.loaded.connect(self._on_loaded)
+        self.renderer.rendered.connect(self._on_rendered)
+        self._thread.start()
+
+    def set_data(self, data: dict):
+        """Hand a new upload response to the renderer and redraw.
+
+        The renderer fetches the chart data for ``data["id"]`` before the
+        first render of the new dataset.
+        """
+        self._has_data = True
+        self._load_ms = None
+        self._load_error = ""
+        self.timing_label.setText("loading chart data...")
+        self.timing_label.setToolTip("")
+        self.load_requested.emit(data)
+        self.refresh()
+
+    def refresh(self):
+        if not self._has_data:
+            return
+        self._request_id += 1
+        self.renderer.latest = self._request_id
+        ratio = self.view.devicePixelRatioF()
+        self.render_requested.emit(
+            self._request_id,
+            self.kind_combo.currentData(),
+            int(self.view.width() * ratio),
+            int(self.view.height() * ratio),
+            100.0 * ratio,
+        )
+
+    def _on_rendered(self, request_id, image, elapsed_ms):
+        if request_id != self._request_id:
+            return
+        image.setDevicePixelRatio(self.view.devicePixelRatioF())
+        self.view.set_image(image)
+        text = f"rendered in {elapsed_ms:.0f} ms"
+        if self._load_error:
+            text = f"chart data unavailable ({self._load_error}), {text}"
+        elif self._load_ms is not None:
+            text = f"data loaded in {self._load_ms:.0f} ms, {text}"
+        self.timing_label.setText(text)
+
+    def _on_loaded(self, elapsed_ms, error):
+        self._load_ms = elapsed_ms
+        self._load_error = error
+        # the full message (e.g. a long URL) stays readable on hover
+        self.timing_label.setToolTip(error)
+
+    def shutdown(self):
+        self._thread.quit()
+        self._thread.wait()
@@ -1,5 +1,9 @@
 # main.py
+import hashlib
+import os
 import sys
+import time
+
 import requests
 
 from PyQt5.QtWidgets import (
@@ -15,10 +19,16 @@ from PyQt5.QtWidgets import (
     QTableWidgetItem,
     QHeaderView,
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+
+# Files larger than this go through the resumable chunked upload API
+# (backend/equipment/views.py: chunked_upload_*) instead of one multipart POST.
+CHUNKED_UPLOAD_THRESHOLD = 32 * 1024 * 1024
+CHUNK_RETRIES = 5
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+# The chart subsystem (charts.py, which imports matplotlib) is loaded lazily in
+# _ensure_charts(): it is the slowest import of the app and isn't needed to
+# show the window.
 
 
 class EquipmentApp(QWidget):
@@ -27,7 +37,7 @@ class EquipmentApp(QWidget):
     Features:
     - Upload CSV file to backend
     - Show summary and data table
-    - Show charts (equipment type distribution)
+    - Show charts (type distribution, histograms, scatter plots)
     - Show history of last 5 uploads
     - Download PDF report for latest upload
     """
@@ -37,6 +47,14 @@ class EquipmentApp(QWidget):
         # Django backend base URL (config/config.urls.py -> path('api/', include('equipment.urls')))
         self.backend_url = "http://127.0.0.1:8000/api"
 
+        # Uploads are stored per user. Without credentials the app uses the
+        # backend's shared anonymous history; set EQUIPMENT_API_USER and
+        # EQUIPMENT_API_PASSWORD to see only your own uploads (Basic Auth).
+        self.http = requests.Session()
+        username = os.environ.get("EQUIPMENT_API_USER")
+        if username:
+            self.http.auth = (username, os.environ.get("EQUIPMENT_API_PASSWORD", ""))
+
         # ID of the most recently uploaded history record (for PDF download)
         self.uploaded_record_id = None
 
@@ -61,10 +79,11 @@ class EquipmentApp(QWidget):
         self.summary_text.setReadOnly(True)
         layout.addWidget(self.summary_text)
 
-        # --- Matplotlib chart (equipment type distribution) ---
-        self.figure = Figure(figsize=(5, 3))
-        self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
+        # --- Charts (type distribution, histograms, scatter) ---
+        # Created on first use, see _ensure_charts()
+        self.chart_panel = None
+        self.chart_layout = QVBoxLayout()
+        layout.addLayout(self.chart_layout)
 
         # --- Detailed table for uploaded data ---
         self.table_widget = QTableWidget()
@@ -87,8 +106,9 @@ class EquipmentApp(QWidget):
 
         self.setLayout(layout)
 
-        # Load existing history (if backend is running)
-        self.load_history(silent=True)
+        # Load existing history (if backend is running) once the window is up,
+        # so a slow or missing backend doesn't delay the first paint
+        QTimer.singleShot(0, lambda: self.load_history(silent=True))
 
     # ------------------------------------------------------------------
     # Backend calls
@@ -104,12 +124,26 @@ class EquipmentApp(QWidget):
         if not file_path:
             return
 
+        # upload_chunked() keeps the window responsive with processEvents(), so
+        # the transfer buttons are disabled to stop a second upload or a PDF
+        # download from starting inside this one
+        self.set_transfer_enabled(False)
         try:
-            with open(file_path, "rb") as f:
-                files = {"file": f}
-                # NOTE: backend URL is /api/upload/ (see backend/equipment/urls.py)
-                response = requests.post(f"{self.backend_url}/upload/", files=files)
+            if os.path.getsize(file_path) > CHUNKED_UPLOAD_THRESHOLD:
+                response = self.upload_chunked(file_path)
+            else:
+                with open(file_path, "rb") as f:
+                    files = {"file": f}
+                    # NOTE: backend URL is /api/upload/ (see backend/equipment/urls.py)
+                    response = self.http.post(f"{self.backend_url}/upload/", files=files)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Exception while uploading: {str(e)}")
+            return
+        finally:
+            self.label.setText("Upload CSV of Chemical Equipment")
+            self.set_transfer_enabled(True)
 
+        try:
             if response.status_code == 200:
                 data = response.json()
                 # Show summary, table, charts
@@ -129,11 +163,83 @@ class EquipmentApp(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Exception while uploading: {str(e)}")
 
+    def set_transfer_enabled(self, enabled):
+        self.upload_btn.setEnabled(enabled)
+        self.download_pdf_btn.setEnabled(enabled)
+
+    def upload_chunked(self, file_path):
+        """Upload a large CSV in checksummed chunks and return the finalize response.
+
+        A failed chunk is retried; before each retry the server is asked for
+        its current offset so the upload resumes where it stopped instead of
+        starting over.
+        """
+        base = f"{self.backend_url}/upload/chunked"
+        total_size = os.path.getsize(file_path)
+
+        response = self.http.post(
+            f"{base}/",
+            data={"filename": os.path.basename(file_path), "total_size": total_size},
+        )
+        if response.status_code != 201:
+            return response
+        session = response.json()
+        upload_id = session["upload_id"]
+        chunk_size = session["chunk_size"]
+        offset = session["offset"]
+
+        with open(file_path, "rb") as f:
+            while offset < total_size:
+                f.seek(offset)
+                chunk = f.read(chunk_size)
+                checksum = hashlib.sha256(chunk).hexdigest()
+
+                for attempt in range(CHUNK_RETRIES):
+                    try:
+                        response = self.http.put(
+                            f"{base}/{upload_id}/",
+                            params={"offset": offset},
+                            data=chunk,
+                            headers={
+                                "Content-Type": "application/octet-stream",
+                                "X-Chunk-Checksum": f"sha256={checksum}",
+                            },
+                            timeout=120,
+                        )
+                    except requests.RequestException:
+                        response = None
+
+                    if response is not None and response.status_code in (200, 400, 409):
+                        state = response.json()
+                        if state.get("status") == "failed":
+                            return response
+                        if response.status_code != 400:
+                            # 409: the server already has (part of) this range,
+                            # resume from the offset it reports
+                            offset = state["offset"]
+                            break
+
+                    time.sleep(2 ** attempt)
+                    try:
+                        status = self.http.get(f"{base}/{upload_id}/", timeout=30)
+                        if status.status_code == 200 and status.json()["offset"] != offset:
+                            offset = status.json()["offset"]
+                            break
+                    except requests.RequestException:
+                        pass
+                else:
+                    raise RuntimeError(f"Chunk at offset {offset} failed after {CHUNK_RETRIES} attempts")
+
+                self.label.setText(f"Uploading {os.path.basename(file_path)}: {offset * 100 // total_size}%")
+                QApplication.processEvents()
+
+        return self.http.post(f"{base}/{upload_id}/finalize/", timeout=600)
+
     def load_history(self, silent: bool = False):
         """Fetch and display last 5 uploads from the backend."""
         try:
             # backend/equipment/urls.py -> path('history/', upload_history)
-            response = requests.get(f"{self.backend_url}/history/")
+            response = self.http.get(f"{self.backend_url}/history/")
             if response.status_code == 200:
                 history = response.json() or []
                 self.populate_history(history)
@@ -164,7 +270,7 @@ class EquipmentApp(QWidget):
 
         try:
             # backend/equipment/urls.py -> path('download-pdf/', download_pdf)
-            response = requests.get(
+            response = self.http.get(
                 f"{self.backend_url}/download-pdf/?id={self.uploaded_record_id}"
             )
             if response.status_code == 200:
@@ -246,42 +352,44 @@ class EquipmentApp(QWidget):
 
         self.history_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
-    def show_charts(self, data: dict):
-        """Render charts using matplotlib (currently: equipment type distribution)."""
-        dist = data.get("equipment_type_distribution", {}) or {}
-
-        # Clear the figure and draw a new chart
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-
-        if dist:
-            types = list(dist.keys())
-            counts = list(dist.values())
-            ax.bar(types, counts, color="skyblue")
-            ax.set_xlabel("Equipment Type")
-            ax.set_ylabel("Count")
-            ax.set_title("Equipment Type Distribution")
-            ax.tick_params(axis="x", rotation=45)
-        else:
-            ax.text(
-                0.5,
-                0.5,
-                "No chart data available",
-                ha="center",
-                va="center",
-                transform=ax.transAxes,
-            )
+    def _ensure_charts(self):
+        """Import the chart subsystem and create the chart panel on first use."""
+        if self.chart_panel is not None:
+            return
 
-        self.figure.tight_layout()
-        self.canvas.draw()
+        from charts import ChartPanel
 
+        self.chart_panel = ChartPanel(self.fetch_chart_data)
+        self.chart_layout.addWidget(self.chart_panel)
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    def fetch_chart_data(self, record_id):
+        """Chart data of one upload; runs in the chart renderer thread.
 
-    # Global violet/blue theme for the whole app
-    app.setStyleSheet(
+        Uses a one-off request rather than ``self.http``, which the GUI thread
+        may be using at the same time.
         """
+        response = requests.get(
+            f"{self.backend_url}/chart-data/",
+            params={"id": record_id},
+            auth=self.http.auth,
+            timeout=120,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"status {response.status_code}")
+        return response.json()
+
+    def show_charts(self, data: dict):
+        """Hand the upload response to the chart panel (fetched and rendered off the GUI thread)."""
+        self._ensure_charts()
+        self.chart_panel.set_data(data)
+
+    def closeEvent(self, event):
+        if self.chart_panel is not None:
+            self.chart_panel.shutdown()
+        super().closeEvent(event)
+
+
+APP_STYLESHEET = """
         QWidget {
             background-color: #1b1233;            /* deep violet */
             color: #E4E7F5;                       /* light text */
@@ -348,8 +456,14 @@ if __name__ == "__main__":
         QScrollBar::sub-line:vertical {
             height: 0px;
         }
-        """
-    )
+"""
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    # Global violet/blue theme for the whole app
+    app.setStyleSheet(APP_STYLESHEET)
 
     window = EquipmentApp()
     window.show()
@@ -59,6 +59,25 @@ function App() {
     }
   };
 
+  // Download PDF report (history is scoped to the logged-in user)
+  const downloadPDF = async (h) => {
+    try {
+      const res = await axios.get("http://127.0.0.1:8000/api/download-pdf/", {
+        params: { id: h.id },
+        auth: { username: "bhagyasri", password: "Test@1234" },
+        responseType: "blob",
+      });
+      const url = window.URL.createObjectURL(res.data);
+      const link = document.createElement("a");
+      link.href = url;
+      link.download = `${h.filename}.pdf`;
+      link.click();
+      window.URL.revokeObjectURL(url);
+    } catch (err) {
+      alert("PDF download failed.");
+    }
+  };
+
   // Chart Data
   const chartData =
     data && data.equipment_type_distribution
@@ -153,11 +172,13 @@ function App() {
                 <td>{h.avg_pressure}</td>
                 <td>{h.avg_temperature}</td>
                 <td>
-                  {/* 🔹 Pass ID as query parameter to match backend */}
+                  {/* 🔹 Uploads are per user, so the PDF is fetched with auth */}
                   <a
                     href={`http://127.0.0.1:8000/api/download-pdf/?id=${h.id}`}
-                    target="_blank"
-                    rel="noreferrer"
+                    onClick={(e) => {
+                      e.preventDefault();
+                      downloadPDF(h);
+                    }}
                   >
                     PDF
                   </a>